@@ -1,283 +1,1244 @@
 from __future__ import annotations
 
+import sys
+
+import launcher_ipc
+
+if __name__ == "__main__":
+    # 二重起動防止: a second start hands its command to the running window and exits before Qt loads
+    _command = launcher_ipc.command_from_argv(sys.argv[1:])
+    if _command is None:
+        print("使い方: Launcher_main.py [run <名前|ID> | add <パス>]", file=sys.stderr)
+        sys.exit(2)
+    _reply = launcher_ipc.send_command(_command)
+    if _reply is not None:
+        sys.exit(launcher_ipc.report(_reply))
+
+import copy
+import functools
 import json
+import math
 import os
-import sys
+import time
 import uuid
 import subprocess
-from dataclasses import dataclass, asdict
-from typing import List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 
-from PySide6.QtCore import Qt, QSize, Signal, QRect, QPoint
-from PySide6.QtGui import QFont, QPainter, QPen, QColor, QPixmap, QDrag
+from PySide6.QtCore import Qt, QObject, QSize, QTimer, Signal, QFileSystemWatcher, QRect, QRectF, QPoint, QEvent, QAbstractListModel, QModelIndex, QMimeData, QByteArray
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+from PySide6.QtGui import QFont, QFontMetrics, QKeySequence, QShortcut, QPainter, QPalette, QPen, QColor, QPixmap, QDrag
 from PySide6.QtWidgets import (
     QApplication,
+    QCheckBox,
     QComboBox,
     QDialog,
     QFileDialog,
     QGridLayout,
+    QGroupBox,
     QHBoxLayout,
-    QInputDialog,
     QLabel,
     QLineEdit,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QMainWindow,
     QMenu,
     QMessageBox,
+    QPlainTextEdit,
     QPushButton,
-    QSizePolicy,
+    QSpinBox,
     QStyle,
+    QStyledItemDelegate,
+    QStyleOptionViewItem,
     QToolButton,
     QVBoxLayout,
     QWidget,
 )
 
+from launcher_core import (
+    CatalogStorage,
+    CorruptCatalogError,
+    ExternalChangeError,
+    LaunchHistory,
+    LaunchProfile,
+    LaunchSpec,
+    LauncherEntry,
+    PrewarmPool,
+    SearchIndex,
+    apply_op,
+    backup_entries,
+    category_end,
+    diff_entries,
+    entry_from_dict,
+    find_entry,
+    get_backup_generations,
+    history_key,
+    id_key,
+    invert_op,
+    load_settings,
+    open_storage,
+    resolve_launch,
+    spawn_spec,
+    split_args,
+)
+
 
 # -----------------------------
-# Storage and model
+# Path health
 # -----------------------------
 
 
-def _app_data_dir() -> str:
-    home = os.path.expanduser("~")
-    path = os.path.join(home, ".launcher")
-    os.makedirs(path, exist_ok=True)
-    return path
+def _is_network_path(path: str) -> bool:
+    return path.startswith(("\\\\", "//"))
+
+
+class PathHealth(QObject):
+    """Background existence checks for entry paths, cached for ttl seconds
 
+    Checks run on a small thread pool with a bounded number in flight, so a sweep over a
+    large catalog never floods it. Local parent directories are watched with
+    QFileSystemWatcher and any change there re-checks the paths inside; network paths
+    (where watching is unreliable) rely on the TTL alone. lookup() never touches the disk.
+    """
 
-def _data_file() -> str:
-    return os.path.join(_app_data_dir(), "launcher_data.json")
+    pathChecked = Signal(str, bool)  # path, exists
+    _checked = Signal(str, bool)  # worker -> GUI thread hand-off
+
+    MAX_INFLIGHT = 16
+    MAX_WATCHED_DIRS = 1000  # stay well inside inotify's per-user watch limit
+
+    def __init__(self, ttl: float = 300.0, parent=None):
+        super().__init__(parent)
+        self._ttl = max(1.0, float(ttl))
+        self._cache: Dict[str, Tuple[bool, float]] = {}  # path -> (exists, checked at)
+        self._queue: Dict[str, None] = {}  # insertion-ordered set of paths waiting for a worker
+        self._inflight: set = set()
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="launcher-path")
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._by_dir: Dict[str, set] = {}  # watched directory -> paths checked inside it
+        self._checked.connect(self._on_checked)
+
+    def lookup(self, path: str) -> Optional[bool]:
+        """Cached existence of path: True/False, or None if not known yet
+
+        An expired result is still returned (it is the best guess) but queued for a re-check.
+        """
+        if not path:
+            return None
+        item = self._cache.get(path)
+        if item is None:
+            self.request(path)
+            return None
+        exists, checked = item
+        if time.monotonic() - checked > self._ttl:
+            self.request(path)
+        return exists
+
+    def fresh(self, path: str) -> Optional[bool]:
+        """Like lookup, but None unless the cached result is within the TTL"""
+        item = self._cache.get(path)
+        if item is None or time.monotonic() - item[1] > self._ttl:
+            return None
+        return item[0]
+
+    def request(self, path: str) -> None:
+        if path and path not in self._inflight and path not in self._queue:
+            self._queue[path] = None
+            self._pump()
+
+    def request_many(self, paths) -> None:
+        for path in paths:
+            if path and path not in self._inflight:
+                self._queue[path] = None
+        self._pump()
+
+    def invalidate(self, path: str) -> None:
+        """Re-check path now; the old result stays visible until the new one arrives"""
+        item = self._cache.get(path)
+        if item is not None:
+            self._cache[path] = (item[0], float("-inf"))
+        self.request(path)
+
+    def _pump(self) -> None:
+        while self._queue and len(self._inflight) < self.MAX_INFLIGHT:
+            path = next(iter(self._queue))
+            del self._queue[path]
+            self._inflight.add(path)
+            future = self._executor.submit(os.path.exists, path)
+            future.add_done_callback(
+                lambda fut, path=path: self._checked.emit(path, not fut.exception() and fut.result()))
+
+    def _on_checked(self, path: str, exists: bool) -> None:
+        self._inflight.discard(path)
+        previous = self._cache.get(path)
+        self._cache[path] = (exists, time.monotonic())
+        if not _is_network_path(path):
+            self._watch_parent(path)
+        self._pump()
+        if previous is None or previous[0] != exists:
+            self.pathChecked.emit(path, exists)
+
+    def _watch_parent(self, path: str) -> None:
+        parent = os.path.dirname(os.path.abspath(path))
+        paths = self._by_dir.get(parent)
+        if paths is None:
+            if len(self._by_dir) >= self.MAX_WATCHED_DIRS or not self._watcher.addPath(parent):
+                return  # e.g. the directory is missing itself; the TTL covers it
+            paths = self._by_dir[parent] = set()
+        paths.add(path)
+
+    def _on_directory_changed(self, directory: str) -> None:
+        paths = self._by_dir.get(directory, ())
+        if not os.path.isdir(directory):
+            # Removed or renamed; Qt drops the watch, so forget it and let re-checks re-add
+            self._by_dir.pop(directory, None)
+            self._watcher.removePath(directory)
+        for path in list(paths):
+            self.invalidate(path)
+
+    def shutdown(self) -> None:
+        self._queue.clear()
+        self._executor.shutdown(wait=False)
+
+
+# -----------------------------
+# Launching
+# -----------------------------
+
+
+class LaunchService(QObject):
+    """Starts entries on a small worker pool and reports back on the GUI thread
+
+    At most one launch per entry is in flight; launch() returns False for a repeat click.
+    """
+
+    launchFinished = Signal(object, object, str)  # entry, Popen or None, error message ("" on success)
+    _spawned = Signal(object, object, object)  # worker -> GUI thread hand-off (entry, Popen, exception)
+
+    def __init__(self, max_workers: int = 4, parent=None):
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="launcher-run")
+        self._pending: set = set()
+        # id key -> ((path, console, profile), spec); profiles are immutable, so the tuple
+        # compares equal exactly while the entry's launch settings are unchanged
+        self._specs: Dict[object, Tuple[tuple, LaunchSpec]] = {}
+        self._spawned.connect(self._on_spawned)
+
+    def spec_for(self, entry: LauncherEntry) -> LaunchSpec:
+        """The entry's resolved LaunchSpec, cached until its path or launch settings change"""
+        fingerprint = (entry.path, entry.console, entry.profile)
+        cached = self._specs.get(entry.key)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        spec = resolve_launch(entry)
+        self._specs[entry.key] = (fingerprint, spec)
+        return spec
+
+    def is_pending(self, entry: LauncherEntry) -> bool:
+        return entry.key in self._pending
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._pending)
+
+    def launch(self, entry: LauncherEntry, check: bool = True, spawn=None) -> bool:
+        """Start entry with spawn(spec, check) (spawn_spec by default) on a worker"""
+        if entry.key in self._pending:
+            return False
+        try:
+            spec = self.spec_for(entry)
+        except ValueError as e:
+            # e.g. an args template shlex cannot split: report it like any failed launch, after
+            # the caller has marked the entry pending, so the pending state is always cleared
+            self._pending.add(entry.key)
+            QTimer.singleShot(0, functools.partial(self._on_spawned, entry, None, e))
+            return True
+        self._pending.add(entry.key)
+        # The worker only sees the resolved spec; the entry may be edited meanwhile
+        future = self._executor.submit(spawn or spawn_spec, spec, check)
+
+        def done(fut: Future) -> None:
+            error = fut.exception()
+            self._spawned.emit(entry, None if error else fut.result(), error)
+
+        future.add_done_callback(done)
+        return True
+
+    def _on_spawned(self, entry: LauncherEntry, proc, error) -> None:
+        self._pending.discard(entry.key)
+        self.launchFinished.emit(entry, proc, "" if error is None else str(error))
+
+    def shutdown(self) -> None:
+        # Launches already handed to the OS finish on their own; nothing to wait for
+        self._executor.shutdown(wait=False)
 
 
 @dataclass
-class LauncherEntry:
-    id: str
-    name: str
-    path: str
-    description: str = ""
-    entry_type: str = "app"  # "app" or "separator"
+class BatchReport:
+    title: str
+    started: List[str] = field(default_factory=list)  # entry names
+    failed: List[Tuple[str, str]] = field(default_factory=list)  # (name, error)
+    skipped: List[str] = field(default_factory=list)  # already being launched
 
-    @staticmethod
-    def from_file(filepath: str) -> "LauncherEntry":
-        base = os.path.splitext(os.path.basename(filepath))[0]
-        return LauncherEntry(
-            id=str(uuid.uuid4()),
-            name=base,
-            path=os.path.abspath(filepath),
-            description="",
-            entry_type="app",
-        )
 
-    @staticmethod
-    def create_separator(name: str) -> "LauncherEntry":
-        return LauncherEntry(
-            id=str(uuid.uuid4()),
-            name=name,
-            path="",
-            description="",
-            entry_type="separator",
-        )
+class BatchLauncher(QObject):
+    """Launches a list of entries with at most max_concurrent launches in flight
 
+    Starts are spaced at least stagger_ms apart. start_fn(entry) begins a launch and
+    returns False if one is already running (skipped), or raises when the launch is known
+    to fail without trying (failed); completions arrive through the LaunchService's
+    launchFinished signal. finished carries a BatchReport.
+    """
 
-def load_entries() -> List[LauncherEntry]:
-    fp = _data_file()
-    if not os.path.exists(fp):
-        return []
-    try:
-        with open(fp, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        items = data.get("entries", [])
-        result: List[LauncherEntry] = []
-        for it in items:
+    finished = Signal(object)  # BatchReport
+    progress = Signal(int, int)  # done, total
+
+    def __init__(self, title: str, entries: List[LauncherEntry], start_fn, service: LaunchService,
+                 max_concurrent: int = 3, stagger_ms: int = 0, parent=None):
+        super().__init__(parent)
+        self.report = BatchReport(title)
+        self._queue = list(entries)
+        self._total = len(self._queue)
+        self._start_fn = start_fn
+        self._service = service
+        self._max = max(1, int(max_concurrent))
+        self._stagger = max(0, int(stagger_ms)) / 1000.0
+        self._next_start = 0.0
+        self._inflight: set = set()
+        self._done = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._pump)
+        service.launchFinished.connect(self._on_finished)
+
+    def start(self) -> None:
+        self._pump()
+
+    def cancel(self) -> None:
+        """Drop the launches not yet started; the ones in flight still report"""
+        self._queue = []
+        self._timer.stop()
+        self._check_done()
+
+    def _done_count(self) -> int:
+        r = self.report
+        return len(r.started) + len(r.failed) + len(r.skipped)
+
+    def _pump(self) -> None:
+        while self._queue and len(self._inflight) < self._max:
+            wait = self._next_start - time.monotonic()
+            if wait > 0:
+                self._timer.start(int(wait * 1000) + 1)
+                return
+            entry = self._queue.pop(0)
             try:
-                result.append(
-                    LauncherEntry(
-                        id=it.get("id", str(uuid.uuid4())),
-                        name=it.get("name", ""),
-                        path=it.get("path", ""),
-                        description=it.get("description", ""),
-                        entry_type=it.get("entry_type", "app"),
-                    )
-                )
-            except Exception:
+                started = self._start_fn(entry)
+            except Exception as e:
+                self.report.failed.append((entry.name, str(e)))
+                self.progress.emit(self._done_count(), self._total)
                 continue
-        return result
-    except Exception:
-        return []
+            if started:
+                self._inflight.add(entry.key)
+                self._next_start = time.monotonic() + self._stagger
+            else:
+                self.report.skipped.append(entry.name)
+                self.progress.emit(self._done_count(), self._total)
+        self._check_done()
+
+    def _on_finished(self, entry: LauncherEntry, proc, error: str) -> None:
+        if entry.key not in self._inflight:
+            return
+        self._inflight.discard(entry.key)
+        if error:
+            self.report.failed.append((entry.name, error))
+        else:
+            self.report.started.append(entry.name)
+        self.progress.emit(self._done_count(), self._total)
+        self._pump()
+
+    def _check_done(self) -> None:
+        if not self._queue and not self._inflight and not self._done:
+            self._done = True
+            self._service.launchFinished.disconnect(self._on_finished)
+            self.finished.emit(self.report)
+
+
+# Optional: per-process CPU/RSS on every platform (and whole process trees on kill).
+# Without it stats come from /proc where available and are simply absent elsewhere.
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+@dataclass
+class ProcessStatus:
+    running: int = 0  # live processes started from the entry
+    exit_code: Optional[int] = None  # of the most recent one to exit
+    cpu: Optional[float] = None  # percent of one core, summed over running processes
+    rss: Optional[int] = None  # bytes, summed over running processes
+
+
+class _Tracked:
+    __slots__ = ("entry", "proc", "ps", "ticks", "sampled", "kill_at", "restart")
+
+    def __init__(self, entry: LauncherEntry, proc: subprocess.Popen):
+        self.entry = entry
+        self.proc = proc
+        self.ps = None  # psutil.Process, created on the first sample
+        self.ticks: Optional[int] = None  # /proc CPU ticks at the last sample
+        self.sampled = 0.0
+        self.kill_at: Optional[float] = None  # escalate terminate() to kill() after this time
+        self.restart = False
 
 
-def get_backup_files() -> List[str]:
-    """Get list of available backup files"""
-    fp = _data_file()
-    backups = []
-    for i in range(1, 11):
-        backup_path = f"{fp}.bak{i}"
-        if os.path.exists(backup_path):
-            backups.append(backup_path)
-    return backups
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
 
 
-def restore_from_backup(backup_path: str) -> bool:
-    """Restore data from backup file"""
+def _proc_sample(pid: int) -> Tuple[Optional[int], Optional[int]]:
+    """(utime + stime in clock ticks, RSS bytes) from /proc; (None, None) where there is no /proc"""
     try:
-        fp = _data_file()
-        import shutil
-        shutil.copy2(backup_path, fp)
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+        with open(f"/proc/{pid}/statm", "rb") as f:
+            statm = f.read()
+    except OSError:
+        return None, None
+    # The command name may contain spaces and parentheses; fields resume after the last ")"
+    fields = stat[stat.rfind(b")") + 2:].split()
+    return int(fields[11]) + int(fields[12]), int(statm.split()[1]) * _PAGE_SIZE
+
+
+class ProcessSupervisor(QObject):
+    """Keeps the Popen handles of launched entries and polls them all from one timer
+
+    Each tick reaps exits with poll() and samples CPU/RSS (psutil if installed, else /proc),
+    then reports every entry whose status changed. The timer only runs while something is
+    tracked. Note that on Windows console launches the tracked process is the cmd window.
+    """
+
+    statusChanged = Signal(object, object)  # entry, ProcessStatus
+    restartRequested = Signal(object)  # entry whose process exited after restart()
+
+    KILL_GRACE_SECONDS = 3.0
+
+    def __init__(self, poll_ms: int = 1000, parent=None):
+        super().__init__(parent)
+        self._tracked: Dict[object, List[_Tracked]] = {}  # id key -> live processes
+        self._status: Dict[object, ProcessStatus] = {}
+        self._timer = QTimer(self)
+        self._timer.setInterval(max(100, int(poll_ms)))
+        self._timer.timeout.connect(self.poll)
+
+    def status(self, entry: LauncherEntry) -> Optional[ProcessStatus]:
+        return self._status.get(entry.key)
+
+    def running(self, entry: LauncherEntry) -> bool:
+        return bool(self._tracked.get(entry.key))
+
+    def track(self, entry: LauncherEntry, proc: subprocess.Popen) -> None:
+        self._tracked.setdefault(entry.key, []).append(_Tracked(entry, proc))
+        self._publish(entry, ProcessStatus(running=len(self._tracked[entry.key])))
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def terminate(self, entry: LauncherEntry, restart: bool = False) -> bool:
+        """Ask the entry's processes to exit (killed after a grace period); False if none run"""
+        items = self._tracked.get(entry.key)
+        if not items:
+            return False
+        deadline = time.monotonic() + self.KILL_GRACE_SECONDS
+        for item in items:
+            item.restart = restart
+            if item.kill_at is None:
+                item.kill_at = deadline
+                self._signal(item, kill=False)
         return True
-    except Exception:
-        return False
 
+    @staticmethod
+    def _signal(item: _Tracked, kill: bool) -> None:
+        procs = []
+        if psutil is not None:
+            # Take the children too: console launches run the tool under a shell
+            try:
+                procs = psutil.Process(item.proc.pid).children(recursive=True)
+            except psutil.Error:
+                pass
+        for p in procs:
+            try:
+                (p.kill if kill else p.terminate)()
+            except psutil.Error:
+                pass
+        try:
+            (item.proc.kill if kill else item.proc.terminate)()
+        except OSError:
+            pass
+
+    def _sample(self, item: _Tracked, now: float) -> Tuple[Optional[float], Optional[int]]:
+        if psutil is not None:
+            try:
+                if item.ps is None:
+                    item.ps = psutil.Process(item.proc.pid)
+                    item.ps.cpu_percent(None)  # primes the counter; the first reading is meaningless
+                    return None, item.ps.memory_info().rss
+                return item.ps.cpu_percent(None), item.ps.memory_info().rss
+            except psutil.Error:
+                return None, None
+        ticks, rss = _proc_sample(item.proc.pid)
+        cpu = None
+        if ticks is not None and item.ticks is not None and now > item.sampled:
+            cpu = (ticks - item.ticks) / _CLK_TCK / (now - item.sampled) * 100.0
+        item.ticks, item.sampled = ticks, now
+        return cpu, rss
+
+    def poll(self) -> None:
+        now = time.monotonic()
+        restart: Dict[object, LauncherEntry] = {}
+        for key in list(self._tracked):
+            items = self._tracked[key]
+            status = ProcessStatus(exit_code=self._status.get(key, ProcessStatus()).exit_code)
+            alive = []
+            for item in items:
+                code = item.proc.poll()
+                if code is not None:
+                    status.exit_code = code
+                    if item.restart:
+                        restart[key] = item.entry
+                    continue
+                if item.kill_at is not None and now >= item.kill_at:
+                    self._signal(item, kill=True)
+                    item.kill_at = now + self.KILL_GRACE_SECONDS
+                alive.append(item)
+                cpu, rss = self._sample(item, now)
+                if cpu is not None:
+                    status.cpu = (status.cpu or 0.0) + cpu
+                if rss is not None:
+                    status.rss = (status.rss or 0) + rss
+            status.running = len(alive)
+            if alive:
+                self._tracked[key] = alive
+            else:
+                del self._tracked[key]
+            self._publish(items[0].entry, status)
+        if not self._tracked:
+            self._timer.stop()
+        for key, entry in restart.items():
+            # Restart once the last of the entry's processes is gone
+            if key not in self._tracked:
+                self.restartRequested.emit(entry)
+
+    def _publish(self, entry: LauncherEntry, status: ProcessStatus) -> None:
+        if self._status.get(entry.key) != status:
+            self._status[entry.key] = status
+            self.statusChanged.emit(entry, status)
+
+    def shutdown(self) -> None:
+        # Launched tools outlive the launcher; only stop watching them
+        self._timer.stop()
+
+
+# -----------------------------
+# Single instance
+# -----------------------------
+
+
+class InstanceServer(QObject):
+    """Receives commands from later starts and launcher_cli.py over a local socket (see launcher_ipc)
 
-def _backup_data_file() -> None:
-    """Create backup copies of data file, keeping up to 10 generations"""
-    fp = _data_file()
-    if not os.path.exists(fp):
-        return
+    commandReceived(command, reply) is emitted once per request; the handler calls reply(dict)
+    exactly once, right away or later (e.g. after loading). Only the current user can connect.
+    """
 
-    # Rotate existing backups
-    for i in range(9, 0, -1):
-        old_backup = f"{fp}.bak{i}"
-        new_backup = f"{fp}.bak{i+1}"
-        if os.path.exists(old_backup):
-            if os.path.exists(new_backup):
-                os.remove(new_backup)
-            os.rename(old_backup, new_backup)
+    commandReceived = Signal(dict, object)
 
-    # Create new backup
-    backup_path = f"{fp}.bak1"
-    if os.path.exists(backup_path):
-        os.remove(backup_path)
-    import shutil
-    shutil.copy2(fp, backup_path)
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._server = QLocalServer(self)
+        self._server.setSocketOptions(QLocalServer.UserAccessOption)
+        self._server.newConnection.connect(self._on_new_connection)
+        self._open: set = set()  # sockets still connected; a late reply to a closed one is dropped
+
+    def listen(self) -> bool:
+        """Start serving; False when another instance already is"""
+        name = launcher_ipc.server_name()
+        if not launcher_ipc.WINDOWS:
+            # The socket lives in the data directory, which does not exist yet on a first run
+            os.makedirs(os.path.dirname(name), exist_ok=True)
+        if self._server.listen(name):
+            return True
+        if launcher_ipc.send_command({"cmd": "ping"}, timeout=1.0) is not None:
+            return False
+        # Nobody answers: a socket file left behind by an instance that crashed
+        QLocalServer.removeServer(name)
+        return self._server.listen(name)
+
+    def _on_new_connection(self):
+        while self._server.hasPendingConnections():
+            sock = self._server.nextPendingConnection()
+            self._open.add(sock)
+            buf = bytearray()
+            sock.readyRead.connect(functools.partial(self._on_ready_read, sock, buf))
+            sock.disconnected.connect(functools.partial(self._on_disconnected, sock))
+
+    def _on_disconnected(self, sock: QLocalSocket):
+        self._open.discard(sock)
+        sock.deleteLater()
+
+    def _on_ready_read(self, sock: QLocalSocket, buf: bytearray):
+        buf += bytes(sock.readAll())
+        if b"\n" not in buf:
+            if len(buf) > launcher_ipc.MAX_MESSAGE:
+                sock.abort()
+            return
+        sock.readyRead.disconnect()
+        reply = functools.partial(self._reply, sock)
+        try:
+            command = json.loads(bytes(buf).split(b"\n", 1)[0].decode("utf-8"))
+        except ValueError:
+            command = None
+        if not isinstance(command, dict):
+            reply({"ok": False, "message": "不正なコマンドです"})
+        elif command.get("cmd") == "ping":
+            reply({"ok": True})
+        else:
+            self.commandReceived.emit(command, reply)
 
+    def _reply(self, sock: QLocalSocket, reply: dict):
+        if sock not in self._open:
+            return  # the client gave up waiting
+        sock.write(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n")
+        sock.disconnectFromServer()
 
-def save_entries(entries: List[LauncherEntry]) -> None:
-    # Create backup before saving
-    _backup_data_file()
+    def errorString(self) -> str:
+        return self._server.errorString()
 
-    fp = _data_file()
-    data = {"entries": [asdict(e) for e in entries]}
-    with open(fp, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    def shutdown(self):
+        self._server.close()
 
 
 # -----------------------------
-# UI widgets
+# Background saving
 # -----------------------------
 
 
-class EntryWidget(QWidget):
-    def __init__(self, entry: LauncherEntry, on_run, parent=None):
+class SaveScheduler(QObject):
+    """Persists operations in batches of at most one write per interval on a worker thread
+
+    Each write hands the storage only the operations recorded since the last one. Once the journal
+    holds compact_after operations (and on close), the next write is a full snapshot instead.
+    """
+
+    saveFinished = Signal(bool, str)  # ok, error message
+    externalChange = Signal()  # a write was refused because another program changed the files
+    _writeDone = Signal(object)  # worker -> GUI thread hand-off (exception or None)
+
+    def __init__(self, get_entries, storage: CatalogStorage, seq: int = 0, journal_ops: int = 0,
+                 interval_ms: int = 500, compact_after: int = 200, parent=None):
         super().__init__(parent)
-        self.entry = entry
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(18, 2, 6, 2)  # 上下マージンを2pxに縮小
-        layout.setSpacing(6)
+        self._get_entries = get_entries
+        self._storage = storage
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="launcher-save")
+        self._inflight: Optional[Future] = None
+        self._inflight_ops: List[dict] = []  # ops being appended, re-queued if that fails
+        self._inflight_compaction = False
+        self._seq = seq
+        self._pending: List[dict] = []
+        self._journal_ops = journal_ops
+        self._compact_after = max(1, int(compact_after))
+        self._compact_requested = False
+        self._held = False
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(max(0, int(interval_ms)))
+        self._timer.timeout.connect(self._start_write)
+        self._writeDone.connect(self._on_write_done)
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._pending) or self._compact_requested or self._inflight is not None
+
+    @property
+    def journal_ops(self) -> int:
+        return self._journal_ops
+
+    def record(self, op: dict) -> dict:
+        """Queue an operation for the journal; returns it stamped with its seq"""
+        self._seq += 1
+        op = dict(op, seq=self._seq)
+        self._pending.append(op)
+        self._journal_ops += 1
+        if self._journal_ops >= self._compact_after:
+            self._compact_requested = True
+        self._arm()
+        return op
+
+    def request_compaction(self) -> None:
+        self._compact_requested = True
+        self._arm()
+
+    def reset(self, seq: int = 0, journal_ops: int = 0) -> None:
+        """Forget queued work, e.g. after the files were replaced underneath us"""
+        self._timer.stop()
+        self._wait_inflight()
+        self._pending = []
+        self._compact_requested = False
+        self._journal_ops = journal_ops
+        self._seq = seq
+
+    def take_unsaved(self) -> List[dict]:
+        """Stop writing and hand back the operations not yet persisted (to re-apply after a merge)"""
+        self._timer.stop()
+        self._wait_inflight()
+        ops, self._pending = self._pending, []
+        return ops
+
+    def requeue(self, ops: List[dict]) -> None:
+        """Put operations from take_unsaved() back unchanged (same seqs, already counted)"""
+        self._pending = ops + self._pending
+        self._arm()
+
+    def hold(self) -> None:
+        """Keep queueing but stop writing until release(), e.g. while the files cannot be merged"""
+        self._held = True
+        self._timer.stop()
+
+    def release(self) -> None:
+        self._held = False
+        if self._pending or self._compact_requested:
+            self._arm()
+
+    def _arm(self) -> None:
+        # The first change opens the window; later ones ride along with it
+        if not self._held and not self._timer.isActive():
+            self._timer.start()
+
+    def _take_job(self):
+        if self._compact_requested:
+            # Entries are edited in place on the GUI thread, so hand the worker copies.
+            # The snapshot covers every queued op, so those never reach the journal.
+            snapshot = [copy.copy(e) for e in self._get_entries()]
+            self._compact_requested = False
+            self._inflight_compaction = True
+            self._inflight_ops = self._pending
+            self._pending = []
+            self._journal_ops = 0
+            return functools.partial(self._storage.snapshot, snapshot, self._seq, self._inflight_ops)
+        if self._pending:
+            self._inflight_compaction = False
+            self._inflight_ops = self._pending
+            self._pending = []
+            return functools.partial(self._storage.append, self._inflight_ops)
+        return None
 
-        text_box = QVBoxLayout()
-        text_box.setContentsMargins(0, 0, 0, 0)
-        text_box.setSpacing(1)  # テキスト間のスペースを縮小
+    def _start_write(self) -> None:
+        if self._inflight is not None:
+            # Single flight: _on_write_done re-arms the timer
+            return
+        job = self._take_job()
+        if job is None:
+            return
+        self._inflight = self._executor.submit(job)
+        self._inflight.add_done_callback(lambda fut: self._writeDone.emit(fut.exception()))
+
+    def _requeue_failed(self) -> None:
+        if self._inflight_compaction:
+            self._compact_requested = True
+        self._pending = self._inflight_ops + self._pending
+        self._inflight_ops = []
+
+    def _on_write_done(self, error) -> None:
+        if self._inflight is None:
+            return  # already collected by flush()/reset()
+        self._inflight = None
+        if error is not None:
+            # Keep the work queued so the next change (or close) retries
+            self._requeue_failed()
+            if isinstance(error, ExternalChangeError):
+                self.externalChange.emit()
+            else:
+                self.saveFinished.emit(False, str(error))
+            return
+        self._inflight_ops = []
+        self.saveFinished.emit(True, "")
+        if self._pending or self._compact_requested:
+            self._timer.start()
 
-        self.name_label = QLabel(entry.name)
-        font = QFont()
-        font.setBold(True)
-        self.name_label.setFont(font)
-        self.name_label.setWordWrap(True)
-
-        self.desc_label = QLabel(entry.description or " ")
-        self.desc_label.setStyleSheet("color: gray;")
-        self.desc_label.setWordWrap(True)
-
-        text_box.addWidget(self.name_label)
-        text_box.addWidget(self.desc_label)
-
-        self.run_btn = QToolButton()
-        self.run_btn.setText("Run")
-        self.run_btn.setToolButtonStyle(Qt.ToolButtonTextOnly)
-        self.run_btn.setAutoRaise(False)
-        self.run_btn.setFixedWidth(48)
-        self.run_btn.setStyleSheet("""
-            QToolButton {
-                background-color: #404040;
-                border: 1px solid #303030;
-                border-radius: 3px;
-                color: #ffffff;
-                padding: 4px;
-            }
-            QToolButton:hover {
-                background-color: #505050;
-                border: 1px solid #404040;
-            }
-            QToolButton:pressed {
-                background-color: #303030;
-                border: 1px solid #202020;
-            }
-        """)
-        self.run_btn.clicked.connect(lambda: on_run(self.entry))
+    def _wait_inflight(self) -> None:
+        if self._inflight is None:
+            return
+        try:
+            self._inflight.result()
+            self._inflight_ops = []
+        except Exception:
+            self._requeue_failed()
+        self._inflight = None
+
+    def flush(self, compact: bool = False) -> None:
+        """Write all queued work synchronously; raises if the final write fails"""
+        self._timer.stop()
+        self._wait_inflight()
+        if compact and (self._journal_ops or self._pending):
+            self._compact_requested = True
+        job = self._take_job()
+        if job is None:
+            return
+        try:
+            job()
+            self._inflight_ops = []
+        except Exception:
+            self._requeue_failed()
+            raise
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
 
-        layout.addLayout(text_box)
-        layout.addWidget(self.run_btn, 0, Qt.AlignRight | Qt.AlignVCenter)
 
-        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+# -----------------------------
+# List model and row rendering
+# -----------------------------
+
 
-    def sizeHint(self) -> QSize:  # ensure compact height
-        return QSize(180, 40)  # 高さを48から40に縮小
+ENTRY_ROLE = Qt.UserRole + 1  # the LauncherEntry itself (Qt.UserRole holds the id)
+PENDING_ROLE = Qt.UserRole + 2  # True while a launch of the entry is in flight
+STATUS_ROLE = Qt.UserRole + 3  # ProcessStatus of the entry's launched processes, or None
+BROKEN_ROLE = Qt.UserRole + 4  # True if the entry's path is known not to exist
+ROW_MIME_TYPE = "application/x-launcher-row"
 
 
-class SeparatorWidget(QWidget):
-    def __init__(self, entry: LauncherEntry, parent=None):
+class LauncherListModel(QAbstractListModel):
+    """Flat list model over the launcher entries; rows are painted by EntryDelegate"""
+
+    def __init__(self, entries: Optional[List[LauncherEntry]] = None, parent=None):
         super().__init__(parent)
-        self.entry = entry
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(6, 6, 6, 6)  # 上下マージンを10から6に縮小
-        layout.setSpacing(2)
+        self._entries: List[LauncherEntry] = []
+        # id key (see id_key) -> entry, always complete
+        self._by_id: Dict[str, LauncherEntry] = {}
+        # id key -> row; only rows below self._rows_valid are guaranteed correct,
+        # the rest are renumbered lazily on the next lookup past that point
+        self._rows: Dict[str, int] = {}
+        self._rows_valid = 0
+        self._pending: set = set()  # id keys with a launch in flight
+        self._status: Dict[object, ProcessStatus] = {}  # id key -> supervisor status
+        self.health: Optional[PathHealth] = None  # answers BROKEN_ROLE from its cache
+        self._reindex(list(entries or []))
+
+    # ----- Qt model interface
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._entries):
+            return None
+        e = self._entries[index.row()]
+        if role == Qt.DisplayRole:
+            return e.name
+        if role == Qt.UserRole:
+            return e.id
+        if role == ENTRY_ROLE:
+            return e
+        if role == PENDING_ROLE:
+            return e.key in self._pending
+        if role == STATUS_ROLE:
+            return self._status.get(e.key)
+        if role == BROKEN_ROLE:
+            return (self.health is not None and e.entry_type != "separator"
+                    and self.health.lookup(e.path) is False)
+        if role == Qt.ToolTipRole and e.entry_type != "separator":
+            return e.path
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemIsDropEnabled
+        # All rows have the same drag/drop flags for simplicity
+        return Qt.ItemIsSelectable | Qt.ItemIsDragEnabled | Qt.ItemIsDropEnabled | Qt.ItemIsEnabled
+
+    def supportedDropActions(self):
+        return Qt.MoveAction
 
-        self.name_label = QLabel(entry.name)
-        font = QFont()
+    def mimeTypes(self) -> List[str]:
+        return [ROW_MIME_TYPE]
+
+    def mimeData(self, indexes):
+        md = QMimeData()
+        rows = ",".join(str(i.row()) for i in indexes if i.isValid())
+        md.setData(ROW_MIME_TYPE, QByteArray(rows.encode("ascii")))
+        return md
+
+    # ----- Entry access and mutation
+    def entries(self) -> List[LauncherEntry]:
+        return self._entries
+
+    def entry_at(self, row: int) -> Optional[LauncherEntry]:
+        if 0 <= row < len(self._entries):
+            return self._entries[row]
+        return None
+
+    def entry_by_id(self, entry_id: str) -> Optional[LauncherEntry]:
+        return self._by_id.get(id_key(entry_id))
+
+    def entry_by_key(self, key) -> Optional[LauncherEntry]:
+        return self._by_id.get(key)
+
+    def row_of(self, entry_id: str) -> int:
+        key = id_key(entry_id)
+        if key not in self._by_id:
+            return -1
+        row = self._rows.get(key, -1)
+        if 0 <= row < self._rows_valid:
+            return row
+        for i in range(self._rows_valid, len(self._entries)):
+            self._rows[self._entries[i].key] = i
+        self._rows_valid = len(self._entries)
+        return self._rows[key]
+
+    def _reindex(self, entries: List[LauncherEntry]) -> None:
+        self._entries = entries
+        self._by_id = {e.key: e for e in entries}
+        self._rows = {e.key: i for i, e in enumerate(entries)}
+        self._rows_valid = len(entries)
+
+    def _invalidate_rows_from(self, row: int) -> None:
+        if row < self._rows_valid:
+            self._rows_valid = row
+
+    def set_entries(self, entries: List[LauncherEntry]) -> None:
+        self.beginResetModel()
+        self._reindex(list(entries))
+        self.endResetModel()
+
+    def insert_entry(self, row: int, entry: LauncherEntry) -> None:
+        row = max(0, min(row, len(self._entries)))
+        self.beginInsertRows(QModelIndex(), row, row)
+        appended = row == len(self._entries) == self._rows_valid
+        self._entries.insert(row, entry)
+        self._by_id[entry.key] = entry
+        self._rows[entry.key] = row
+        if appended:
+            self._rows_valid += 1
+        else:
+            self._invalidate_rows_from(row)
+        self.endInsertRows()
+
+    def append_entry(self, entry: LauncherEntry) -> None:
+        self.insert_entry(len(self._entries), entry)
+
+    def append_entries(self, entries: List[LauncherEntry]) -> None:
+        if not entries:
+            return
+        first = len(self._entries)
+        self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+        all_valid = self._rows_valid == first
+        self._entries.extend(entries)
+        for i, e in enumerate(entries, start=first):
+            self._by_id[e.key] = e
+            self._rows[e.key] = i
+        if all_valid:
+            self._rows_valid = len(self._entries)
+        self.endInsertRows()
+
+    def remove_row(self, row: int) -> Optional[LauncherEntry]:
+        if not 0 <= row < len(self._entries):
+            return None
+        self.beginRemoveRows(QModelIndex(), row, row)
+        entry = self._entries.pop(row)
+        self._by_id.pop(entry.key, None)
+        self._rows.pop(entry.key, None)
+        self._invalidate_rows_from(row)
+        self.endRemoveRows()
+        return entry
+
+    def remove_entry(self, entry_id: str) -> Optional[LauncherEntry]:
+        return self.remove_row(self.row_of(entry_id))
+
+    def entry_changed(self, row: int) -> None:
+        if 0 <= row < len(self._entries):
+            idx = self.index(row)
+            self.dataChanged.emit(idx, idx)
+
+    def set_pending(self, entry: LauncherEntry, pending: bool) -> None:
+        if pending:
+            self._pending.add(entry.key)
+        else:
+            self._pending.discard(entry.key)
+        self._role_changed(entry, PENDING_ROLE)
+
+    def set_status(self, entry: LauncherEntry, status: Optional[ProcessStatus]) -> None:
+        if status is None:
+            self._status.pop(entry.key, None)
+        else:
+            self._status[entry.key] = status
+        self._role_changed(entry, STATUS_ROLE)
+
+    def _role_changed(self, entry: LauncherEntry, role: int) -> None:
+        if entry.key in self._by_id:
+            idx = self.index(self.row_of(entry.id))
+            self.dataChanged.emit(idx, idx, [role])
+
+    def move_row(self, src: int, dst: int) -> bool:
+        """Move row src so that it lands before the row currently at dst"""
+        n = len(self._entries)
+        if not 0 <= src < n or not 0 <= dst <= n or dst in (src, src + 1):
+            return False
+        self.beginMoveRows(QModelIndex(), src, src, QModelIndex(), dst)
+        e = self._entries.pop(src)
+        self._entries.insert(dst if dst < src else dst - 1, e)
+        self._invalidate_rows_from(min(src, dst))
+        self.endMoveRows()
+        return True
+
+    def sync_to(self, entries: List[LauncherEntry]) -> Tuple[int, int, int]:
+        """Make the rows equal entries with row-level inserts, removals, moves and updates
+
+        Rows whose entry is unchanged are left alone, so selection and scroll position survive.
+        Returns (added, removed, updated).
+        """
+        wanted = {e.key for e in entries}
+        removed = 0
+        for e in [e for e in self._entries if e.key not in wanted]:
+            self.remove_row(self.row_of(e.id))
+            removed += 1
+        added = updated = 0
+        for i, target in enumerate(entries):
+            current = self._entries[i] if i < len(self._entries) else None
+            if current is None or current.key != target.key:
+                current = self._by_id.get(target.key)
+                if current is None:
+                    self.insert_entry(i, target)
+                    added += 1
+                    continue
+                self.move_row(self.row_of(current.id), i)
+            if current != target:
+                current.assign(target)
+                self.entry_changed(i)
+                updated += 1
+        return added, removed, updated
+
+
+class EntryDelegate(QStyledItemDelegate):
+    """Paints app rows (name, description, Run button) and category rows"""
+
+    runClicked = Signal(QModelIndex)
+
+    APP_HEIGHT = 40
+    SEPARATOR_HEIGHT = 34
+    RUN_BUTTON_WIDTH = 48
+    RUN_BUTTON_HEIGHT = 24
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._hover_row = -1  # row whose Run button is under the mouse
+        self._pressed_row = -1  # row whose Run button is held down
+
+    def sizeHint(self, option, index) -> QSize:
+        e = index.data(ENTRY_ROLE)
+        if e is not None and e.entry_type == "separator":
+            return QSize(180, self.SEPARATOR_HEIGHT)
+        return QSize(180, self.APP_HEIGHT)
+
+    def run_button_rect(self, rect: QRect) -> QRect:
+        x = rect.right() - 6 - self.RUN_BUTTON_WIDTH
+        y = rect.center().y() - self.RUN_BUTTON_HEIGHT // 2
+        return QRect(x, y, self.RUN_BUTTON_WIDTH, self.RUN_BUTTON_HEIGHT)
+
+    def paint(self, painter, option, index):
+        e = index.data(ENTRY_ROLE)
+        if e is None:
+            return
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        opt.text = ""
+        # Background (selection / hover) comes from the view's style sheet
+        style = opt.widget.style() if opt.widget else QApplication.style()
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, opt, painter, opt.widget)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        if e.entry_type == "separator":
+            self._paint_separator(painter, opt, e)
+        else:
+            self._paint_app(painter, opt, index.row(), e, bool(index.data(PENDING_ROLE)), index.data(STATUS_ROLE),
+                            bool(index.data(BROKEN_ROLE)))
+        painter.restore()
+
+    def _paint_separator(self, painter, opt, e: LauncherEntry) -> None:
+        rect = opt.rect.adjusted(6, 6, -6, -6)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor("#f0f0f0"))
+        painter.drawRoundedRect(rect, 3, 3)
+
+        font = QFont(opt.font)
         font.setBold(True)
-        self.name_label.setFont(font)
-        self.name_label.setAlignment(Qt.AlignCenter)
-        self.name_label.setStyleSheet("color: #666666; background-color: #f0f0f0; padding: 4px; border-radius: 3px; min-height: 12px;")  # パディングと高さを縮小
+        painter.setFont(font)
+        painter.setPen(QColor("#666666"))
+        text = QFontMetrics(font).elidedText(e.name, Qt.ElideRight, rect.width() - 8)
+        painter.drawText(rect, Qt.AlignCenter, text)
 
-        layout.addWidget(self.name_label)
-        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+    @staticmethod
+    def status_text(status: Optional[ProcessStatus]) -> str:
+        if status is None:
+            return ""
+        if status.running:
+            parts = ["実行中" if status.running == 1 else f"実行中 ×{status.running}"]
+            if status.cpu is not None:
+                parts.append(f"CPU {status.cpu:.0f}%")
+            if status.rss is not None:
+                parts.append(f"{status.rss / (1 << 20):.0f} MB")
+            return " ".join(parts)
+        if status.exit_code is not None:
+            return f"終了 ({status.exit_code})"
+        return ""
+
+    def _paint_app(self, painter, opt, row: int, e: LauncherEntry, pending: bool = False,
+                   status: Optional[ProcessStatus] = None, broken: bool = False) -> None:
+        selected = bool(opt.state & QStyle.State_Selected)
+        btn = self.run_button_rect(opt.rect)
+        text_rect = QRect(opt.rect.left() + 18, opt.rect.top() + 2, 0, opt.rect.height() - 4)
+        text_rect.setRight(btn.left() - 6)
+        half = text_rect.height() // 2
+
+        name_font = QFont(opt.font)
+        name_font.setBold(True)
+        painter.setFont(name_font)
+        if selected:
+            painter.setPen(QColor("white"))
+        else:
+            painter.setPen(QColor("#c0392b") if broken else opt.palette.color(QPalette.Text))
+        name = QFontMetrics(name_font).elidedText(e.name, Qt.ElideRight, text_rect.width())
+        painter.drawText(QRect(text_rect.left(), text_rect.top(), text_rect.width(), half),
+                         Qt.AlignLeft | Qt.AlignBottom, name)
+
+        # Process state: a dot left of the name and a summary in front of the description
+        if status is not None and (status.running or status.exit_code):
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor("#3cb043") if status.running else QColor("#d9534f"))
+            painter.drawEllipse(QPoint(opt.rect.left() + 10, text_rect.top() + half - 6), 3, 3)
+        detail = e.description
+        state = self.status_text(status)
+        if broken and not state:
+            state = "ファイルが見つかりません"
+        if state:
+            detail = f"{state} · {detail}" if detail else state
+
+        if detail:
+            painter.setFont(opt.font)
+            painter.setPen(QColor("#dddddd") if selected else QColor("gray"))
+            desc = QFontMetrics(opt.font).elidedText(detail, Qt.ElideRight, text_rect.width())
+            painter.drawText(QRect(text_rect.left(), text_rect.top() + half + 1, text_rect.width(), half),
+                             Qt.AlignLeft | Qt.AlignTop, desc)
+
+        # Run button
+        if row == self._pressed_row:
+            bg, border = "#303030", "#202020"
+        elif row == self._hover_row:
+            bg, border = "#505050", "#404040"
+        else:
+            bg, border = "#404040", "#303030"
+        painter.setPen(QPen(QColor(border), 1))
+        painter.setBrush(QColor(bg))
+        painter.drawRoundedRect(QRectF(btn).adjusted(0.5, 0.5, -0.5, -0.5), 3, 3)
+        if pending:
+            # Spinner while the launch is in flight; the window repaints it on a timer
+            side = btn.height() - 10
+            arc = QRectF(btn.center().x() - side / 2, btn.center().y() - side / 2, side, side)
+            painter.setPen(QPen(QColor("#ffffff"), 2, Qt.SolidLine, Qt.RoundCap))
+            painter.setBrush(Qt.NoBrush)
+            start = -int(time.monotonic() * 360) % 360
+            painter.drawArc(arc, start * 16, 270 * 16)
+            return
+        painter.setFont(opt.font)
+        painter.setPen(QColor("#ffffff"))
+        painter.drawText(btn, Qt.AlignCenter, "Run")
+
+    def editorEvent(self, event, model, option, index):
+        e = index.data(ENTRY_ROLE)
+        if e is None or e.entry_type == "separator":
+            return super().editorEvent(event, model, option, index)
+
+        etype = event.type()
+        if etype not in (QEvent.MouseMove, QEvent.MouseButtonPress, QEvent.MouseButtonRelease,
+                         QEvent.MouseButtonDblClick):
+            return super().editorEvent(event, model, option, index)
+
+        on_button = self.run_button_rect(option.rect).contains(event.position().toPoint())
+        row = index.row()
+        if etype == QEvent.MouseMove:
+            hover = row if on_button else -1
+            if hover != self._hover_row:
+                self._hover_row = hover
+                self._repaint(option)
+            return False
+        if event.button() != Qt.LeftButton:
+            return super().editorEvent(event, model, option, index)
+        if etype in (QEvent.MouseButtonPress, QEvent.MouseButtonDblClick):
+            if on_button:
+                self._pressed_row = row
+                self._repaint(option)
+                return True
+            return False
+        # Release
+        was_pressed = self._pressed_row == row
+        self._pressed_row = -1
+        self._repaint(option)
+        if was_pressed and on_button:
+            self.runClicked.emit(index)
+            return True
+        return False
+
+    def clear_hover(self) -> None:
+        self._hover_row = -1
+        self._pressed_row = -1
 
-    def sizeHint(self) -> QSize:
-        return QSize(180, 34)  # 高さを46から34に縮小
+    @staticmethod
+    def _repaint(option) -> None:
+        if option.widget is not None:
+            option.widget.viewport().update()
 
 
-class LauncherListWidget(QListWidget):
+class LauncherListWidget(QListView):
     filesDropped = Signal(list)  # list[str]
-    orderChanged = Signal()
+    orderChanged = Signal(int, int)  # from row, to row
+    runRequested = Signal(str)  # entry id
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setAcceptDrops(True)
         self.setDragEnabled(True)
-        self.setDragDropMode(QListWidget.InternalMove)
+        self.setDragDropMode(QListView.InternalMove)
         self.setDefaultDropAction(Qt.MoveAction)
-        self.setSelectionMode(QListWidget.SingleSelection)
+        self.setSelectionMode(QListView.SingleSelection)
         self.setSpacing(1)  # アイテム間のスペースを2から1に縮小
+        # Rows have two heights, so lay them out in batches instead of all at once
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(200)
+        self.setMouseTracking(True)  # Run button hover
+
+        self._delegate = EntryDelegate(self)
+        self._delegate.runClicked.connect(lambda idx: self.runRequested.emit(idx.data(Qt.UserRole)))
+        self.setItemDelegate(self._delegate)
 
         # Enable drop indicator line
         self.setDropIndicatorShown(True)
 
         # Set selection highlight color and drop indicator style
         self.setStyleSheet("""
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #2B5A8C;
                 color: white;
             }
-            QListWidget::item:selected:!active {
+            QListView::item:selected:!active {
                 background-color: #4A7AAD;
                 color: white;
             }
-            QListWidget::item:hover {
+            QListView::item:hover {
                 background-color: rgba(100, 200, 255, 40);
                 border: 1px solid rgba(150, 220, 255, 100);
             }
-            QListWidget::indicator {
+            QListView::indicator {
                 background-color: #FF6B6B;
                 height: 3px;
             }
@@ -286,59 +1247,60 @@ class LauncherListWidget(QListWidget):
         # Track if we're in internal drag operation
         self._is_internal_drag = False
         self._drop_indicator_rect = QRect()
+        self._drop_row = -1
+
+    def _render_row(self, index) -> QPixmap:
+        rect = self.visualRect(index)
+        pixmap = QPixmap(rect.size())
+        pixmap.fill(Qt.transparent)
+        option = QStyleOptionViewItem()
+        self.initViewItemOption(option)
+        option.rect = QRect(QPoint(0, 0), rect.size())
+        option.state |= QStyle.State_Selected
+        painter = QPainter(pixmap)
+        self.itemDelegate().paint(painter, option, index)
+        painter.end()
+        return pixmap
 
     def startDrag(self, supportedActions):
-        self._is_internal_drag = True
-
-        # Create custom drag pixmap with black transparency
-        selected_items = self.selectedItems()
-        if selected_items:
-            item = selected_items[0]
-            widget = self.itemWidget(item)
-            if widget:
-                # Create a pixmap of the widget (scaled down to 80% to see below)
-                original_size = widget.size()
-                scaled_size = QSize(int(original_size.width() * 0.8), int(original_size.height() * 0.8))
-
-                pixmap = QPixmap(original_size)
-                pixmap.fill(Qt.transparent)
-                widget.render(pixmap)
-
-                # Scale down the pixmap
-                scaled_pixmap = pixmap.scaled(scaled_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-
-                # Create a semi-transparent black overlay
-                overlay = QPixmap(scaled_size)
-                overlay.fill(QColor(0, 0, 0, 20))  # Black with 20/255 opacity (much lighter)
-
-                # Combine original pixmap with black overlay
-                painter = QPainter(scaled_pixmap)
-                painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
-                painter.drawPixmap(0, 0, overlay)
-                painter.end()
-
-                # Create drag object and set custom pixmap
-                drag = QDrag(self)
-                drag.setMimeData(self.model().mimeData(self.selectedIndexes()))
-                drag.setPixmap(scaled_pixmap)
-                drag.setHotSpot(QPoint(scaled_pixmap.width() // 2, scaled_pixmap.height() // 2))
-
-                # Execute drag
-                drag.exec(Qt.MoveAction)
-
-                # Clean up after drag
-                self._drop_indicator_rect = QRect()
-                for i in range(self.count()):
-                    item = self.item(i)
-                    widget = self.itemWidget(item)
-                    if widget:
-                        widget.setStyleSheet("")
-                self._is_internal_drag = False
-                self.viewport().update()
-                self.orderChanged.emit()
-                return
+        index = self.currentIndex()
+        if not index.isValid():
+            super().startDrag(supportedActions)
+            return
 
-        super().startDrag(supportedActions)
+        self._is_internal_drag = True
+        self._delegate.clear_hover()
+
+        # Create a pixmap of the row (scaled down to 80% to see below)
+        pixmap = self._render_row(index)
+        original_size = pixmap.size()
+        scaled_size = QSize(int(original_size.width() * 0.8), int(original_size.height() * 0.8))
+        scaled_pixmap = pixmap.scaled(scaled_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+        # Create a semi-transparent black overlay
+        overlay = QPixmap(scaled_size)
+        overlay.fill(QColor(0, 0, 0, 20))  # Black with 20/255 opacity (much lighter)
+
+        # Combine original pixmap with black overlay
+        painter = QPainter(scaled_pixmap)
+        painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+        painter.drawPixmap(0, 0, overlay)
+        painter.end()
+
+        # Create drag object and set custom pixmap
+        drag = QDrag(self)
+        drag.setMimeData(self.model().mimeData([index]))
+        drag.setPixmap(scaled_pixmap)
+        drag.setHotSpot(QPoint(scaled_pixmap.width() // 2, scaled_pixmap.height() // 2))
+
+        # Execute drag; the move itself is applied in dropEvent
+        drag.exec(Qt.MoveAction)
+
+        # Clean up after drag
+        self._drop_indicator_rect = QRect()
+        self._drop_row = -1
+        self._is_internal_drag = False
+        self.viewport().update()
 
     def paintEvent(self, event):
         super().paintEvent(event)
@@ -367,6 +1329,11 @@ class LauncherListWidget(QListWidget):
             painter.setPen(pen)
             painter.drawLine(left, y, right, y)
 
+    def leaveEvent(self, event):
+        self._delegate.clear_hover()
+        self.viewport().update()
+        super().leaveEvent(event)
+
     def dragEnterEvent(self, event):
         if event.source() is self:
             event.acceptProposedAction()
@@ -384,46 +1351,52 @@ class LauncherListWidget(QListWidget):
             event.accept()
 
             # Update drop indicator position
-            item = self.itemAt(event.pos())
-            if item:
-                rect = self.visualItemRect(item)
+            pos = event.position().toPoint()
+            index = self.indexAt(pos)
+            if index.isValid():
+                rect = self.visualRect(index)
                 # Determine if we should drop above or below the item
-                if event.pos().y() < rect.center().y():
+                if pos.y() < rect.center().y():
                     # Drop above
                     self._drop_indicator_rect = QRect(rect.left(), rect.top(), rect.width(), 1)
+                    self._drop_row = index.row()
                 else:
                     # Drop below
                     self._drop_indicator_rect = QRect(rect.left(), rect.bottom(), rect.width(), 1)
+                    self._drop_row = index.row() + 1
             else:
                 # Drop at the end
-                if self.count() > 0:
-                    last_item = self.item(self.count() - 1)
-                    rect = self.visualItemRect(last_item)
+                count = self.model().rowCount()
+                if count > 0:
+                    rect = self.visualRect(self.model().index(count - 1, 0))
                     self._drop_indicator_rect = QRect(rect.left(), rect.bottom(), rect.width(), 1)
+                self._drop_row = count
 
             self.viewport().update()
+        elif event.mimeData().hasUrls():
+            event.acceptProposedAction()
         else:
             super().dragMoveEvent(event)
 
     def dropEvent(self, event):
         if event.source() is self:
-            # Qt標準処理を実行してドラッグ機能を有効にする
-            super().dropEvent(event)
+            src = self.currentIndex().row()
+            dst = self._drop_row
 
             # Clear drop indicator
             self._drop_indicator_rect = QRect()
-
-            # Restore visual appearance of all items
-            for i in range(self.count()):
-                item = self.item(i)
-                widget = self.itemWidget(item)
-                if widget:
-                    widget.setStyleSheet("")
-
+            self._drop_row = -1
             self._is_internal_drag = False
             self.viewport().update()
-            # Emit orderChanged after internal drag & drop
-            self.orderChanged.emit()
+
+            event.setDropAction(Qt.MoveAction)
+            event.accept()
+            model = self.model()
+            if src >= 0 and model.move_row(src, dst):
+                new_row = dst if dst < src else dst - 1
+                self.setCurrentIndex(model.index(new_row, 0))
+                # Emit orderChanged after internal drag & drop
+                self.orderChanged.emit(src, new_row)
             return
 
         md = event.mimeData()
@@ -443,24 +1416,25 @@ class LauncherListWidget(QListWidget):
         # Restore visual appearance if drag is cancelled
         if self._is_internal_drag:
             self._drop_indicator_rect = QRect()
-            for i in range(self.count()):
-                item = self.item(i)
-                widget = self.itemWidget(item)
-                if widget:
-                    widget.setStyleSheet("")
-            self._is_internal_drag = False
+            self._drop_row = -1
             self.viewport().update()
         super().dragLeaveEvent(event)
 
 
+# -----------------------------
+# Dialogs
+# -----------------------------
+
+
 class EntryDialog(QDialog):
-    def __init__(self, entry: Optional[LauncherEntry] = None, parent=None):
+    def __init__(self, entry: Optional[LauncherEntry] = None, parent=None, health: Optional[PathHealth] = None):
         super().__init__(parent)
         self.setWindowTitle("登録 / 編集")
         self.setModal(True)
 
         self._is_edit = entry is not None
         self._entry = entry
+        self._health = health
 
         lay = QGridLayout(self)
         row = 0
@@ -490,11 +1464,54 @@ class EntryDialog(QDialog):
         lay.addWidget(self.browse_btn, row, 2)
         row += 1
 
+        # Existence is checked in the background as the path is typed
+        self.path_state = QLabel("")
+        lay.addWidget(self.path_state, row, 1, 1, 2)
+        row += 1
+        self._path_timer = QTimer(self)
+        self._path_timer.setSingleShot(True)
+        self._path_timer.setInterval(300)
+        self._path_timer.timeout.connect(self._update_path_state)
+        self.path_edit.textChanged.connect(self._path_timer.start)
+        if health is not None:
+            health.pathChecked.connect(self._on_path_checked)
+
         lay.addWidget(QLabel("概要"), row, 0)
         self.desc_edit = QLineEdit(entry.description if entry else "")
         lay.addWidget(self.desc_edit, row, 1, 1, 2)
         row += 1
 
+        self.console_check = QCheckBox("コンソールで実行（終了後もウィンドウを残す）")
+        self.console_check.setChecked(bool(entry and entry.console))
+        lay.addWidget(self.console_check, row, 1, 1, 2)
+        row += 1
+
+        # Launch profile; all optional
+        profile = (entry.profile if entry else None) or LaunchProfile()
+        self.profile_box = QGroupBox("起動オプション")
+        play = QGridLayout(self.profile_box)
+        self.args_edit = QLineEdit(profile.args)
+        self.args_edit.setPlaceholderText("例: --port 8080 \"{dir}\\config.ini\"")
+        self.args_edit.setToolTip("{path}, {dir}, {name} はファイルのパス・フォルダ・名前に置き換えられます")
+        self.cwd_edit = QLineEdit(profile.cwd)
+        self.cwd_edit.setPlaceholderText("既定: ファイルのあるフォルダ")
+        self.interpreter_edit = QLineEdit(profile.interpreter)
+        self.interpreter_edit.setPlaceholderText("python の実行ファイルまたは venv フォルダ（.py/.pyw のみ）")
+        self.env_edit = QPlainTextEdit("\n".join(f"{k}={v}" for k, v in profile.env.items()))
+        self.env_edit.setPlaceholderText("KEY=VALUE（1行に1つ。値を空にすると削除）")
+        self.env_edit.setFixedHeight(60)
+        self.nice_spin = QSpinBox()
+        self.nice_spin.setRange(-20, 19)
+        self.nice_spin.setValue(profile.nice)
+        self.nice_spin.setToolTip("正の値で優先度を下げ、負の値で上げます")
+        for i, (label, widget) in enumerate((("引数", self.args_edit), ("作業フォルダ", self.cwd_edit),
+                                             ("インタプリタ", self.interpreter_edit), ("環境変数", self.env_edit),
+                                             ("優先度 (nice)", self.nice_spin))):
+            play.addWidget(QLabel(label), i, 0)
+            play.addWidget(widget, i, 1)
+        lay.addWidget(self.profile_box, row, 0, 1, 3)
+        row += 1
+
         btns = QHBoxLayout()
         save_btn = QPushButton("保存")
         cancel_btn = QPushButton("キャンセル")
@@ -507,12 +1524,45 @@ class EntryDialog(QDialog):
 
         self.setFixedWidth(420)
         self._on_type_changed()
+        self._update_path_state()
 
     def _on_type_changed(self):
         is_category = self.type_combo.currentIndex() == 1
         self.path_label.setVisible(not is_category)
         self.path_edit.setVisible(not is_category)
         self.browse_btn.setVisible(not is_category)
+        self.path_state.setVisible(not is_category)
+        self.console_check.setVisible(not is_category)
+        self.profile_box.setVisible(not is_category)
+
+    def _update_path_state(self):
+        path = self.path_edit.text().strip()
+        if self._health is None or not path:
+            self.path_state.setText("")
+            return
+        exists = self._health.lookup(path)
+        self.path_state.setStyleSheet("color: gray;" if exists is None else "color: #c0392b;")
+        self.path_state.setText("確認中…" if exists is None else "" if exists else "⚠ ファイルが見つかりません")
+
+    def _on_path_checked(self, path: str, exists: bool):
+        if path == self.path_edit.text().strip():
+            self._update_path_state()
+
+    def _profile(self) -> Optional[LaunchProfile]:
+        env = {}
+        for line in self.env_edit.toPlainText().splitlines():
+            key, sep, value = line.partition("=")
+            if key.strip():
+                env[key.strip()] = value.strip() if sep else ""
+        profile = LaunchProfile(self.args_edit.text().strip(), env, self.cwd_edit.text().strip(),
+                                self.interpreter_edit.text().strip(), self.nice_spin.value())
+        return profile or None
+
+    def _path_exists(self, path: str) -> Optional[bool]:
+        if self._health is None:
+            return os.path.exists(path)
+        # Never block on the disk here; an unchecked path is flagged in the list later if missing
+        return self._health.fresh(path)
 
     def _browse(self):
         path, _ = QFileDialog.getOpenFileName(self, "ファイル選択", "", "実行ファイル (*.py *.pyw *.exe *.bat *.cmd);;すべてのファイル (*.*)")
@@ -534,14 +1584,24 @@ class EntryDialog(QDialog):
             # Category entry
             entry_type = "separator"
             path = ""
+            console = False
+            profile = None
         else:
             # App entry
             entry_type = "app"
             path = self.path_edit.text().strip()
+            console = self.console_check.isChecked()
+            profile = self._profile()
+            if profile and profile.args:
+                try:
+                    split_args(profile.args, path)
+                except ValueError as e:
+                    QMessageBox.warning(self, "引数エラー", f"引数を解釈できません: {e}")
+                    return None
             if not path:
                 QMessageBox.warning(self, "未入力", "アプリケーションにはパスが必須です。")
                 return None
-            if not os.path.exists(path):
+            if self._path_exists(path) is False:
                 ret = QMessageBox.question(self, "ファイル未検出", "指定したパスが存在しません。保存しますか？")
                 if ret != QMessageBox.Yes:
                     return None
@@ -551,8 +1611,11 @@ class EntryDialog(QDialog):
             self._entry.path = path
             self._entry.description = desc
             self._entry.entry_type = entry_type
+            self._entry.console = console
+            self._entry.profile = profile
             return self._entry
-        return LauncherEntry(id=str(uuid.uuid4()), name=name, path=path, description=desc, entry_type=entry_type)
+        return LauncherEntry(id=str(uuid.uuid4()), name=name, path=path, description=desc, entry_type=entry_type,
+                             console=console, profile=profile)
 
 
 # -----------------------------
@@ -560,6 +1623,12 @@ class EntryDialog(QDialog):
 # -----------------------------
 
 
+LOAD_PAGE_SIZE = 64  # about one screenful of rows
+LOAD_TICK_SECONDS = 0.008  # time slice for streaming the rest of the catalog in
+MOST_USED_LIMIT = 20  # rows in the most-used view
+FRECENCY_SEARCH_WEIGHT = 40.0  # frecency bonus per log-unit of score; below the gaps between match kinds
+
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -567,7 +1636,48 @@ class MainWindow(QMainWindow):
         self.setMinimumWidth(250)
         self.resize(250, 930)
 
-        self.entries: List[LauncherEntry] = load_entries()
+        self.settings = load_settings()
+        self.storage = open_storage(self.settings)
+        self.model = LauncherListModel([], self)
+        # seq / journal size are filled in by _finish_loading once the catalog is in
+        self._saver = SaveScheduler(
+            self.model.entries,
+            self.storage,
+            interval_ms=self.settings["save_interval_ms"],
+            compact_after=self.settings["journal_compact_ops"],
+            parent=self,
+        )
+        self._saver.saveFinished.connect(self._on_save_finished)
+        self._saver.externalChange.connect(self._merge_external)
+        # Changes to the catalog files by other programs (hand edits, a second launcher, the CLI
+        # without a running window) are checked for shortly after the watcher reports them
+        self._catalog_watcher = QFileSystemWatcher(self)
+        self._external_check = QTimer(self)
+        self._external_check.setSingleShot(True)
+        self._external_check.setInterval(300)
+        self._external_check.timeout.connect(self._check_external)
+        self._catalog_watcher.fileChanged.connect(lambda _path: self._external_check.start())
+        self._catalog_watcher.directoryChanged.connect(lambda _path: self._external_check.start())
+        self.history = LaunchHistory(half_life_days=self.settings["frecency_half_life_days"])
+        self.history.load()
+        self._launcher = LaunchService(parent=self)
+        self._launcher.launchFinished.connect(self._on_launch_finished)
+        self._spin_timer = QTimer(self)
+        self._spin_timer.setInterval(50)
+        self._spin_timer.timeout.connect(lambda: self.list.viewport().update())
+        self._prewarm: Optional[PrewarmPool] = None
+        if self.settings["prewarm_enabled"]:
+            self._prewarm = PrewarmPool(self.settings["prewarm_size"], self.settings["prewarm_preload"])
+        self._health = PathHealth(ttl=self.settings["path_check_ttl_s"], parent=self)
+        self.model.health = self._health
+        self._supervisor = ProcessSupervisor(poll_ms=self.settings["process_poll_ms"], parent=self)
+        self._supervisor.statusChanged.connect(self._on_process_status)
+        self._supervisor.restartRequested.connect(self._run_entry)
+
+        # Undo history: journal operations since the last snapshot plus this session's
+        self._undo_stack: List[dict] = []
+        # run/add commands from other processes that arrived before the catalog finished loading
+        self._queued_commands: List[tuple] = []
 
         central = QWidget()
         self.setCentralWidget(central)
@@ -582,6 +1692,20 @@ class MainWindow(QMainWindow):
         add_btn.setToolTip("新規登録")
         add_btn.clicked.connect(self.add_entry_dialog)
 
+        undo_btn = QToolButton()
+        undo_btn.setText("↶")
+        undo_btn.setToolTip("元に戻す (Ctrl+Z)")
+        undo_btn.clicked.connect(self.undo)
+        QShortcut(QKeySequence.Undo, self, activated=self.undo)
+
+        self.most_used_btn = QToolButton()
+        self.most_used_btn.setText("★")
+        self.most_used_btn.setToolTip("よく使う項目 (Ctrl+1〜9 で上から起動)")
+        self.most_used_btn.setCheckable(True)
+        self.most_used_btn.toggled.connect(lambda _checked: self._refresh_search())
+        for n in range(1, 10):
+            QShortcut(QKeySequence(f"Ctrl+{n}"), self, activated=functools.partial(self._launch_most_used, n))
+
         restore_btn = QToolButton()
         restore_btn.setText("↺")
         restore_btn.setToolTip("バックアップから復旧")
@@ -589,116 +1713,546 @@ class MainWindow(QMainWindow):
 
         top_bar.addStretch(1)
         top_bar.addWidget(add_btn)
+        top_bar.addWidget(undo_btn)
+        top_bar.addWidget(self.most_used_btn)
         top_bar.addWidget(restore_btn)
         root.addLayout(top_bar)
 
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("検索… (Enter で起動)")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(self._refresh_search)
+        self.search_edit.returnPressed.connect(self._run_top_hit)
+        self.search_edit.installEventFilter(self)
+        QShortcut(QKeySequence.Find, self, activated=self.search_edit.setFocus)
+        root.addWidget(self.search_edit)
+
         self.list = LauncherListWidget()
-        self.list.itemDoubleClicked.connect(self.edit_selected)
+        self.list.setModel(self.model)
+        self.list.doubleClicked.connect(self.edit_selected)
         self.list.setContextMenuPolicy(Qt.CustomContextMenu)
         self.list.customContextMenuRequested.connect(self._context_menu)
         self.list.filesDropped.connect(self._handle_files_dropped)
         self.list.orderChanged.connect(self._save_current_order)
+        self.list.runRequested.connect(self._run_entry_by_id)
         root.addWidget(self.list, 1)
 
-        self._refresh_list()
+        # Search index: filled in idle time after loading, then kept in step with the model
+        self._search_index = SearchIndex()
+        self._index_todo: List[LauncherEntry] = []
+        self._index_ready = False
+        self._index_timer = QTimer(self)
+        self._index_timer.setInterval(0)
+        self._index_timer.timeout.connect(self._index_more)
+        self._results = LauncherListModel([], self)
+        self._results.health = self._health
+        # Path check results repaint the list, coalesced so a sweep costs a few repaints
+        self._health_repaint = QTimer(self)
+        self._health_repaint.setSingleShot(True)
+        self._health_repaint.setInterval(100)
+        self._health_repaint.timeout.connect(lambda: self.list.viewport().update())
+        self._health.pathChecked.connect(lambda _path, _exists: self._health_repaint.start())
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(0)
+        self._search_timer.timeout.connect(self._refresh_search)
+        self.model.rowsInserted.connect(self._on_rows_inserted)
+        self.model.rowsAboutToBeRemoved.connect(self._on_rows_removed)
+        self.model.dataChanged.connect(self._on_rows_changed)
+        self.model.modelReset.connect(self._on_model_reset)
+
+        # Materialise the first screenful now; stream the rest in between paints
+        self._loading = True
+        self.list.setDragEnabled(False)
+        self._stream = self.storage.stream()
+        self._pages = self._stream.pages(LOAD_PAGE_SIZE)
+        self._load_timer = QTimer(self)
+        self._load_timer.setInterval(0)
+        self._load_timer.timeout.connect(self._load_more)
+        self._load_more(first=True)
+        if self._loading:
+            self._load_timer.start()
+
+    # ----- Incremental loading
+    def _load_more(self, first: bool = False):
+        deadline = time.perf_counter() + LOAD_TICK_SECONDS
+        batch: List[LauncherEntry] = []
+        done = False
+        try:
+            while True:
+                page = next(self._pages, None)
+                if page is None:
+                    done = True
+                    break
+                batch.extend(page)
+                if first or time.perf_counter() >= deadline:
+                    break
+        except CorruptCatalogError:
+            # Let the full loader deal with it (it falls back to the newest good backup)
+            self._load_timer.stop()
+            catalog = self.storage.load(adopt=True)
+            self.model.set_entries(catalog.entries)
+            self._finish_loading(catalog.seq, [], catalog.torn, history=catalog.history, problems=catalog.problems)
+            if catalog.recovered:
+                self._saver.request_compaction()
+            elif catalog.unreadable:
+                # Nothing to put in its place: leave the file for the user to repair or restore
+                self._saver.hold()
+            if catalog.unreadable:
+                self._report_unreadable(catalog.recovered)
+            return
+        self.model.append_entries(batch)
+        if done:
+            self._load_timer.stop()
+            ops, torn = self._stream.journal()
+            self._finish_loading(self._stream.seq, ops, torn, problems=self._stream.problems)
+        else:
+            self.statusBar().showMessage(f"読み込み中… {self.model.rowCount()} 件")
+
+    def _finish_loading(self, seq: int, ops: List[dict], torn: bool,
+                        history: Optional[List[dict]] = None, problems: Optional[List[str]] = None):
+        history = list(history or [])
+        for op in ops:
+            if self._apply_op(op):
+                history.append(op)
+            seq = max(seq, op.get("seq", 0))
+        for op in history:
+            self._push_history(op)
+        self._saver.reset(seq, journal_ops=len(history))
+        if torn:
+            # A partial journal record must not be appended to; fold it into a snapshot
+            self._saver.request_compaction()
+        self._loading = False
+        self._pages = None
+        self._stream = None
+        self.list.setDragEnabled(not self._filtered())
+        self.statusBar().clearMessage()
+        self._index_timer.start()
+        self._health.request_many(e.path for e in self.model.entries() if e.entry_type != "separator")
+        if self._prewarm is not None:
+            self._prewarm.warm(self.model.entries(), self._launcher.spec_for)
+        if self._filtered():
+            self._refresh_search()
+        if problems:
+            self._report_load_problems(problems)
+        self._watch_catalog()
+        queued, self._queued_commands = self._queued_commands, []
+        for command, reply in queued:
+            self.handle_command(command, reply)
+
+    def _report_load_problems(self, problems: List[str]):
+        # Non-modal: the catalog is usable, the user just needs to know what was left out
+        box = QMessageBox(QMessageBox.Warning, "読み込み警告",
+                          f"不正な形式のエントリ {len(problems)} 件を読み込めませんでした。", QMessageBox.Ok, self)
+        box.setDetailedText("\n".join(problems))
+        box.setModal(False)
+        box.setAttribute(Qt.WA_DeleteOnClose)
+        box.show()
+
+    def _report_unreadable(self, recovered: bool):
+        # Non-modal as well; with a backup, the compaction requested alongside rewrites the broken file
+        if recovered:
+            text = ("データファイルが壊れていたため、最新のバックアップから読み込みました。\n"
+                    "データファイルはこの内容で書き直します。")
+        else:
+            text = ("データファイルが壊れていて、読み込めるバックアップもありません。\n"
+                    "ファイルはそのまま残し、修正されるまで保存を保留します。")
+        box = QMessageBox(QMessageBox.Warning, "読み込み警告", text, QMessageBox.Ok, self)
+        box.setModal(False)
+        box.setAttribute(Qt.WA_DeleteOnClose)
+        box.show()
+
+    def _check_loaded(self) -> bool:
+        if self._loading:
+            self.statusBar().showMessage("読み込み中です。しばらくお待ちください", 2000)
+            return False
+        return True
 
-    # ----- UI population
-    def _refresh_list(self):
-        self.list.clear()
-        for e in self.entries:
-            item = QListWidgetItem()
-            item.setData(Qt.UserRole, e.id)
-            if e.entry_type == "separator":
-                widget = SeparatorWidget(e)
-            else:
-                widget = EntryWidget(e, self._run_entry)
-            # All items have the same drag/drop flags for simplicity
-            item.setFlags(Qt.ItemIsSelectable | Qt.ItemIsDragEnabled | Qt.ItemIsDropEnabled | Qt.ItemIsEnabled)
-            item.setSizeHint(widget.sizeHint())
-            self.list.addItem(item)
-            self.list.setItemWidget(item, widget)
+    def closeEvent(self, event):
+        try:
+            try:
+                self._saver.flush(compact=True)
+            except ExternalChangeError:
+                # Fold the other program's changes in first, then write the merged catalog
+                self._merge_external()
+                self._saver.flush(compact=True)
+        except Exception as e:
+            ret = QMessageBox.question(self, "保存エラー", f"変更を保存できませんでした:\n{e}\n\n保存せずに終了しますか？")
+            if ret != QMessageBox.Yes:
+                event.ignore()
+                return
+        self._saver.shutdown()
+        self._launcher.shutdown()
+        self._supervisor.shutdown()
+        self._health.shutdown()
+        if self._prewarm is not None:
+            self._prewarm.shutdown()
+        super().closeEvent(event)
+
+    # ----- Search
+    def _searching(self) -> bool:
+        return bool(self.search_edit.text().strip())
+
+    def _filtered(self) -> bool:
+        """True while the list shows search results or the most-used view instead of the catalog"""
+        return self._searching() or self.most_used_btn.isChecked()
+
+    def _on_rows_inserted(self, parent, first: int, last: int):
+        added = self.model.entries()[first:last + 1]
+        if self._index_ready:
+            for e in added:
+                self._search_index.add(e)
+        else:
+            self._index_todo.extend(added)
+        self._schedule_search()
+
+    def _on_rows_removed(self, parent, first: int, last: int):
+        for e in self.model.entries()[first:last + 1]:
+            self._search_index.remove(e.key)
+        self._schedule_search()
+
+    def _on_rows_changed(self, top_left, bottom_right, roles=()):
+        if roles and set(roles) <= {PENDING_ROLE, STATUS_ROLE}:
+            return
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            e = self.model.entry_at(row)
+            # Entries still waiting in _index_todo are indexed with their new text anyway
+            if e is not None and e in self._search_index:
+                self._search_index.update(e)
+        self._schedule_search()
+
+    def _on_model_reset(self):
+        self._search_index.clear()
+        self._index_todo = list(self.model.entries())
+        self._index_ready = False
+        if not self._loading:
+            self._index_timer.start()
+        self._schedule_search()
+
+    def _index_more(self):
+        deadline = time.perf_counter() + LOAD_TICK_SECONDS
+        todo = self._index_todo
+        while todo and time.perf_counter() < deadline:
+            for e in todo[-LOAD_PAGE_SIZE:]:
+                # Skip anything deleted since it was queued
+                if self.model.entry_by_id(e.id) is e:
+                    self._search_index.add(e)
+            del todo[-LOAD_PAGE_SIZE:]
+        if not todo:
+            self._index_timer.stop()
+            self._index_ready = True
+
+    def _ensure_index(self):
+        if not self._index_ready:
+            self._index_timer.stop()
+            for e in self._index_todo:
+                if self.model.entry_by_id(e.id) is e:
+                    self._search_index.add(e)
+            self._index_todo = []
+            self._index_ready = True
+
+    def _schedule_search(self):
+        if self._filtered() and not self._loading:
+            self._search_timer.start()
+
+    def _refresh_search(self):
+        if self._searching():
+            self._ensure_index()
+            now = time.time()
+            results = self._search_index.search(
+                self.search_edit.text(),
+                boost=lambda e: FRECENCY_SEARCH_WEIGHT * math.log1p(self.history.score(e, now)),
+            )
+        elif self.most_used_btn.isChecked():
+            results = self._most_used(MOST_USED_LIMIT)
+        else:
+            if self.list.model() is not self.model:
+                current = self._selected_entry()
+                self.list.setModel(self.model)
+                self._results.set_entries([])
+                self.list.setDragEnabled(not self._loading)
+                if current is not None:
+                    index = self.model.index(self.model.row_of(current.id))
+                    self.list.setCurrentIndex(index)
+                    self.list.scrollTo(index)
+            return
+        self._results.set_entries(results)
+        if self.list.model() is not self._results:
+            # Result order is not the catalog order, so no reordering while filtered
+            self.list.setDragEnabled(False)
+            self.list.setModel(self._results)
+        if self._results.rowCount():
+            self.list.setCurrentIndex(self._results.index(0))
+
+    def _most_used(self, limit: int) -> List[LauncherEntry]:
+        legacy = None
+
+        def lookup(key):
+            nonlocal legacy
+            entry = self.model.entry_by_key(key)
+            if entry is None:
+                # History keys of non-uuid ids are digests; map them back on demand
+                if legacy is None:
+                    legacy = {history_key(e): e for e in self.model.entries() if not isinstance(e.key, bytes)}
+                entry = legacy.get(key)
+            return entry
+
+        return self.history.most_used(lookup, limit)
+
+    def _launch_most_used(self, n: int):
+        if not self._check_loaded():
+            return
+        top = self._most_used(n)
+        if len(top) < n:
+            self.statusBar().showMessage(f"よく使う項目の {n} 番目はまだありません", 2000)
+            return
+        self._run_entry(top[n - 1])
+
+    def _run_top_hit(self):
+        if not self._searching():
+            return
+        if self._search_timer.isActive():
+            self._search_timer.stop()
+            self._refresh_search()
+        entry = self._selected_entry()
+        if entry is not None:
+            self._run_entry(entry)
+
+    def eventFilter(self, obj, event):
+        if obj is self.search_edit and event.type() == QEvent.KeyPress:
+            if event.key() == Qt.Key_Escape and self.search_edit.text():
+                self.search_edit.clear()
+                return True
+            if event.key() == Qt.Key_Down:
+                self.list.setFocus()
+                return True
+        return super().eventFilter(obj, event)
+
+    # ----- Persistence and undo
+    def _record(self, op: dict, undoable: bool = True):
+        op = self._saver.record(op)
+        if undoable:
+            self._push_history(op)
+
+    def _push_history(self, op: dict):
+        if op.get("undo"):
+            if self._undo_stack:
+                self._undo_stack.pop()
+        else:
+            self._undo_stack.append(op)
+
+    def _apply_op(self, op: dict) -> bool:
+        """Apply a journal operation to the live model"""
+        kind = op["op"]
+        if kind == "add":
+            self.model.insert_entry(op["index"], entry_from_dict(op["entry"]))
+            return True
+        if kind == "delete":
+            return self.model.remove_entry(op["entry"]["id"]) is not None
+        if kind == "update":
+            entry = self.model.entry_by_id(op["after"]["id"])
+            if entry is None:
+                return False
+            entry.assign(entry_from_dict(op["after"]))
+            self.model.entry_changed(self.model.row_of(entry.id))
+            return True
+        if kind == "move":
+            row = self.model.row_of(op["id"])
+            if row < 0:
+                return False
+            to = op["to"]
+            return self.model.move_row(row, to + 1 if to > row else to)
+        return False
+
+    def undo(self):
+        if not self._check_loaded():
+            return
+        if not self._undo_stack:
+            self.statusBar().showMessage("元に戻す操作がありません", 2000)
+            return
+        op = self._undo_stack.pop()
+        inverse = invert_op(op)
+        if self._apply_op(inverse):
+            inverse["undo"] = True
+            self._record(inverse, undoable=False)
+
+    def _on_save_finished(self, ok: bool, error: str):
+        if ok:
+            if not self._saver.dirty:
+                self.statusBar().showMessage("保存しました", 2000)
+        else:
+            self.statusBar().showMessage(f"保存に失敗しました: {error}")
+
+    # ----- Changes made by other programs
+    def _watch_catalog(self):
+        paths = self.storage.watched_paths()
+        if not paths:
+            return
+        # Saves replace the data file, which drops a file watch; the directory watch sees that
+        directory = os.path.dirname(paths[0])
+        watched = set(self._catalog_watcher.files()) | set(self._catalog_watcher.directories())
+        missing = [p for p in [directory, *paths] if p not in watched and os.path.exists(p)]
+        if missing:
+            self._catalog_watcher.addPaths(missing)
+
+    def _check_external(self):
+        if self._loading:
+            return
+        self._watch_catalog()
+        try:
+            changed = self.storage.changed_externally()
+        except OSError as e:
+            self.statusBar().showMessage(f"カタログの変更を確認できません: {e}", 5000)
+            return
+        if changed:
+            self._merge_external()
+        else:
+            # e.g. a broken hand edit was undone: what we last saw is back, so saving can resume
+            self._saver.release()
+
+    def _hold_saves(self, unsaved: List[dict]):
+        # Writing would only be refused again; wait for the watcher to report the next change
+        self._saver.hold()
+        self._saver.requeue(unsaved)
+
+    def _requeue(self, ops: List[dict]):
+        for op in ops:
+            op = {k: v for k, v in op.items() if k != "seq"}
+            self._saver.record(op)
+
+    def _merge_external(self):
+        """Reload the catalog files changed by another program and fold them into the list
+
+        Operations not yet saved here are re-applied on top, so neither side's edits are lost;
+        where both changed the same entry, this window's edit wins.
+        """
+        if self._loading:
+            return
+        unsaved = self._saver.take_unsaved()
+        try:
+            catalog = self.storage.load()
+        except Exception as e:
+            self._hold_saves(unsaved)
+            self.statusBar().showMessage(f"外部の変更を読み込めません: {e}", 10000)
+            return
+        if catalog.unreadable:
+            # Probably a hand edit in progress; keep our changes queued until the file parses again
+            self._hold_saves(unsaved)
+            self.statusBar().showMessage("外部で変更されたデータファイルを読み込めません。修正されるまで保存を保留します", 10000)
+            return
+        merged = catalog.entries
+        kept = [op for op in unsaved if apply_op(merged, op)]
+        added, removed, updated = self.model.sync_to(merged)
+        self._saver.reset(catalog.seq, journal_ops=len(catalog.history))
+        self._saver.release()
+        self._requeue(kept)
+        self.statusBar().showMessage(
+            f"外部の変更を反映しました（追加 {added} / 削除 {removed} / 更新 {updated}）", 5000)
+
+    @property
+    def entries(self) -> List[LauncherEntry]:
+        return self.model.entries()
 
     def _find_entry_by_id(self, entry_id: str) -> Optional[LauncherEntry]:
-        for e in self.entries:
-            if e.id == entry_id:
-                return e
-        return None
+        return self.model.entry_by_id(entry_id)
 
     def _selected_entry(self) -> Optional[LauncherEntry]:
-        item = self.list.currentItem()
-        if not item:
+        index = self.list.currentIndex()
+        if not index.isValid():
             return None
-        entry_id = item.data(Qt.UserRole)
+        entry_id = index.data(Qt.UserRole)
         return self._find_entry_by_id(entry_id)
 
     # ----- Actions
     def add_entry_dialog(self, from_path: Optional[str] = None):
+        if not self._check_loaded():
+            return
         if from_path:
             tmp = LauncherEntry.from_file(from_path)
-            dlg = EntryDialog(tmp, self)
+            dlg = EntryDialog(tmp, self, health=self._health)
         else:
-            dlg = EntryDialog(None, self)
+            dlg = EntryDialog(None, self, health=self._health)
         if dlg.exec() == QDialog.Accepted:
             entry = dlg.get_entry()
             if entry is None:
                 return
-            self.entries.append(entry)
-            save_entries(self.entries)
-            self._refresh_list()
+            row = self.model.rowCount()
+            self.model.append_entry(entry)
+            self._record({"op": "add", "index": row, "entry": entry.to_dict()})
 
     def edit_selected(self):
+        if not self._check_loaded():
+            return
         entry = self._selected_entry()
         if not entry:
             return
-        dlg = EntryDialog(entry, self)
+        before = entry.to_dict()
+        dlg = EntryDialog(entry, self, health=self._health)
         if dlg.exec() == QDialog.Accepted:
             entry2 = dlg.get_entry()
             if entry2 is None:
                 return
-            save_entries(self.entries)
-            self._refresh_list()
+            after = entry2.to_dict()
+            row = self.model.row_of(entry2.id)
+            self.model.entry_changed(row)
+            if after != before:
+                self._record({"op": "update", "index": row, "before": before, "after": after})
 
     def _context_menu(self, pos):
-        item = self.list.itemAt(pos)
+        index = self.list.indexAt(pos)
         menu = QMenu(self)
 
-        if not item:
+        if not index.isValid():
             act_add = menu.addAction("新規追加")
             chosen = menu.exec(self.list.mapToGlobal(pos))
             if chosen == act_add:
                 self.add_entry_dialog()
             return
 
-        entry_id = item.data(Qt.UserRole)
+        entry_id = index.data(Qt.UserRole)
         entry = self._find_entry_by_id(entry_id)
         if not entry:
             return
 
         if entry.entry_type == "separator":
+            act_launch_all = menu.addAction("すべて起動")
+            menu.addSeparator()
             act_edit = menu.addAction("Edit")
             menu.addSeparator()
             act_delete = menu.addAction("Delete")
         else:
             act_run = menu.addAction("Run")
+            act_stop = act_restart = None
+            if self._supervisor.running(entry):
+                act_stop = menu.addAction("停止")
+                act_restart = menu.addAction("再起動")
             act_edit = menu.addAction("Edit")
             menu.addSeparator()
             act_delete = menu.addAction("Delete")
 
         chosen = menu.exec(self.list.mapToGlobal(pos))
-        if entry.entry_type != "separator" and chosen == act_run:
+        if chosen is None:
+            return
+        if entry.entry_type == "separator" and chosen == act_launch_all:
+            self._launch_category(entry)
+        elif entry.entry_type != "separator" and chosen == act_run:
             self._run_entry(entry)
+        elif entry.entry_type != "separator" and chosen in (act_stop, act_restart):
+            self._stop_entry(entry, restart=chosen == act_restart)
         elif chosen == act_edit:
             self.edit_selected()
         elif chosen == act_delete:
             self._delete_entry(entry)
 
     def _delete_entry(self, entry: LauncherEntry):
+        if not self._check_loaded():
+            return
         ret = QMessageBox.question(self, "削除確認", f"『{entry.name}』を削除しますか？")
         if ret != QMessageBox.Yes:
             return
-        self.entries = [e for e in self.entries if e.id != entry.id]
-        save_entries(self.entries)
-        self._refresh_list()
+        row = self.model.row_of(entry.id)
+        self.model.remove_entry(entry.id)
+        self._record({"op": "delete", "index": row, "entry": entry.to_dict()})
 
     def _handle_files_dropped(self, paths: List[str]):
         # Register each dropped file
@@ -708,45 +2262,19 @@ class MainWindow(QMainWindow):
             # Create dialog pre-filled; user can just type description and save
             self.add_entry_dialog(from_path=p)
 
-    def _save_current_order(self):
-        # Read items from QListWidget in order and reorder self.entries accordingly
-        ordered_ids: List[str] = []
-        for i in range(self.list.count()):
-            item = self.list.item(i)
-            if item:
-                eid = item.data(Qt.UserRole)
-                if eid:
-                    ordered_ids.append(eid)
-
-        # Validation checks
-        original_ids = {e.id for e in self.entries}
-        ordered_ids_set = set(ordered_ids)
-
-        # Check for missing entries or duplicate IDs
-        if original_ids != ordered_ids_set or len(ordered_ids) != len(ordered_ids_set):
-            # Data inconsistency detected, refresh list
-            self._refresh_list()
-            return
-
-        # Reorder entries based on UI order
-        id_to_entry = {e.id: e for e in self.entries}
-        new_entries = [id_to_entry[eid] for eid in ordered_ids]
-
-        # Save the new order
-        self.entries = new_entries
-        try:
-            save_entries(self.entries)
-        except Exception as e:
-            QMessageBox.warning(self, "保存エラー", f"並び順の保存に失敗しました:\n{e}")
-            # Reload entries from disk to maintain consistency
-            self.entries = load_entries()
-            self._refresh_list()
+    def _save_current_order(self, src: int, dst: int):
+        # The view has already moved the row inside the model; journal the move
+        entry = self.model.entry_at(dst)
+        if entry is not None:
+            self._record({"op": "move", "id": entry.id, "from": src, "to": dst})
 
     # ----- Run
 
     def show_restore_dialog(self):
+        if not self._check_loaded():
+            return
         from PySide6.QtWidgets import QListWidget, QVBoxLayout, QPushButton, QHBoxLayout
-        backups = get_backup_files()
+        backups = get_backup_generations()
         if not backups:
             QMessageBox.information(self, "復旧", "利用可能なバックアップファイルがありません。")
             return
@@ -759,30 +2287,41 @@ class MainWindow(QMainWindow):
         layout.addWidget(QLabel("復旧するバックアップを選択してください:"))
 
         backup_list = QListWidget()
-        for i, backup_path in enumerate(backups):
-            import time
-            try:
-                mtime = os.path.getmtime(backup_path)
-                time_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mtime))
-                backup_list.addItem(f"バックアップ{i+1} ({time_str})")
-            except:
-                backup_list.addItem(f"バックアップ{i+1}")
+        for i, backup in enumerate(backups):
+            time_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(backup["time"]))
+            backup_list.addItem(f"バックアップ{i+1} ({time_str})")
         layout.addWidget(backup_list)
 
+        layout.addWidget(QLabel("現在の一覧からの変更点:"))
+        preview = QPlainTextEdit()
+        preview.setReadOnly(True)
+        preview.setLineWrapMode(QPlainTextEdit.NoWrap)
+        layout.addWidget(preview, 1)
+
         buttons = QHBoxLayout()
         restore_btn = QPushButton("復旧")
+        restore_btn.setEnabled(False)
         cancel_btn = QPushButton("キャンセル")
 
+        def show_preview(row: int):
+            restore_btn.setEnabled(False)
+            if row < 0:
+                preview.clear()
+                return
+            try:
+                entries = backup_entries(backups[row]["generation"])
+            except Exception as e:
+                preview.setPlainText(f"このバックアップは読み込めません: {e}")
+                return
+            preview.setPlainText(self._restore_preview(entries))
+            restore_btn.setEnabled(True)
+
         def do_restore():
             current_row = backup_list.currentRow()
-            if current_row >= 0:
-                backup_path = backups[current_row]
-                if restore_from_backup(backup_path):
-                    QMessageBox.information(dialog, "復旧完了", "データが復旧されました。アプリケーションを再起動してください。")
-                    dialog.accept()
-                else:
-                    QMessageBox.warning(dialog, "復旧失敗", "復旧に失敗しました。")
+            if current_row >= 0 and self._restore_backup(backups[current_row]["generation"], dialog):
+                dialog.accept()
 
+        backup_list.currentRowChanged.connect(show_preview)
         restore_btn.clicked.connect(do_restore)
         cancel_btn.clicked.connect(dialog.reject)
         buttons.addStretch()
@@ -790,59 +2329,239 @@ class MainWindow(QMainWindow):
         buttons.addWidget(cancel_btn)
         layout.addLayout(buttons)
 
-        dialog.setFixedSize(400, 300)
+        dialog.resize(480, 520)
         dialog.exec()
 
-    def _run_entry(self, entry: LauncherEntry):
+    def _restore_preview(self, entries: List[LauncherEntry], limit: int = 200) -> str:
+        """What restoring entries would change, one line per entry ("+" added, "-" removed, "~" changed)"""
+        added, removed, changed = diff_entries(self.entries, entries)
+        lines = [f"追加 {len(added)} 件 / 削除 {len(removed)} 件 / 変更 {len(changed)} 件"]
+        if not (added or removed or changed):
+            same_order = [e.key for e in self.entries] == [e.key for e in entries]
+            lines.append("現在の一覧と同じです" if same_order else "並び順のみが異なります")
+        for e in added:
+            lines.append(f"+ {e.name}")
+        for e in removed:
+            lines.append(f"- {e.name}")
+        for old, new in changed:
+            fields = [slot.lstrip("_") for slot in LauncherEntry.__slots__ if getattr(old, slot) != getattr(new, slot)]
+            label = old.name if old.name == new.name else f"{old.name} → {new.name}"
+            lines.append(f"~ {label} ({', '.join(fields)})")
+        if len(lines) > limit + 1:
+            lines[limit + 1:] = [f"…ほか {len(lines) - limit - 1} 件"]
+        return "\n".join(lines)
+
+    def _restore_backup(self, generation: int, parent: QWidget) -> bool:
+        """Swap a backup in and bring the running list to it; the state it replaces becomes a backup too"""
+        # Read it before the flush below: that adds a generation and may prune this one
+        try:
+            entries = backup_entries(generation)
+        except Exception as e:
+            QMessageBox.warning(parent, "復旧失敗", f"このバックアップは読み込めません:\n{e}")
+            return False
+        try:
+            try:
+                # Snapshot first: the current catalog becomes the newest backup, so this can be undone
+                self._saver.flush(compact=True)
+            except ExternalChangeError:
+                self._merge_external()
+                self._saver.flush(compact=True)
+        except Exception as e:
+            QMessageBox.warning(parent, "復旧失敗", f"現在のデータを保存できないため復旧を中止しました:\n{e}")
+            return False
+        if not self.storage.restore(generation, entries):
+            QMessageBox.warning(parent, "復旧失敗", "復旧に失敗しました。")
+            return False
+        catalog = self.storage.load()
+        added, removed, updated = self.model.sync_to(catalog.entries)
+        self._saver.reset(catalog.seq, journal_ops=len(catalog.history))
+        self._saver.release()
+        # Undo history describes the replaced catalog
+        self._undo_stack.clear()
+        self.statusBar().showMessage(
+            f"バックアップから復旧しました（追加 {added} / 削除 {removed} / 更新 {updated}）", 5000)
+        return True
+
+    def _run_entry_by_id(self, entry_id: str):
+        entry = self._find_entry_by_id(entry_id)
+        if entry is not None:
+            self._run_entry(entry)
+
+    def _run_entry(self, entry: LauncherEntry) -> bool:
+        try:
+            return self._start_entry(entry)
+        except FileNotFoundError as e:
+            self.statusBar().showMessage(f"『{entry.name}』の起動に失敗しました: {e}", 10000)
+            return False
+
+    def _start_entry(self, entry: LauncherEntry) -> bool:
+        """Begin launching entry; False if it is already being launched
+
+        Raises FileNotFoundError, without starting anything, when the path is known to be missing.
+        """
         if entry.entry_type == "separator":
-            return
+            return False
+        exists = self._health.fresh(entry.path)
+        if exists is False:
+            # Known missing: fail without touching the disk, but re-check in case it is back
+            self._health.invalidate(entry.path)
+            self._record_launch(entry, False)
+            raise FileNotFoundError("ファイルが見つかりません。編集で修正してください。")
+        spawn = None
+        try:
+            prewarmed = self._prewarm is not None and self._prewarm.usable(entry, self._launcher.spec_for(entry))
+        except ValueError:
+            prewarmed = False  # launch() reports the unresolvable spec
+        if prewarmed:
+            spawn = functools.partial(self._prewarm.launch, preload=self._prewarm.preload_for(entry))
+        # A path checked within the TTL skips the worker's own existence check
+        if not self._launcher.launch(entry, check=exists is None, spawn=spawn):
+            self.statusBar().showMessage(f"『{entry.name}』は起動処理中です", 2000)
+            return False
+        for model in (self.model, self._results):
+            model.set_pending(entry, True)
+        if not self._spin_timer.isActive():
+            self._spin_timer.start()
+        return True
 
-        path = entry.path
+    # ----- Commands from other processes (launcher_ipc)
+    def handle_command(self, command: dict, reply):
+        """Carry out a show/run/add command; reply(dict) is called once with the outcome"""
+        kind = command.get("cmd")
+        if kind == "show":
+            if self.isMinimized():
+                self.showNormal()
+            self.show()
+            self.raise_()
+            self.activateWindow()
+            reply({"ok": True})
+            return
+        if kind not in ("run", "add"):
+            reply({"ok": False, "message": f"不明なコマンドです: {kind}"})
+            return
+        if self._loading:
+            self._queued_commands.append((command, reply))
+            return
+        if kind == "run":
+            result = self._run_command(str(command.get("target", "")))
+        else:
+            result = self._add_command(command)
+        if result.get("message"):
+            self.statusBar().showMessage(result["message"], 5000)
+        reply(result)
+
+    def _run_command(self, target: str) -> dict:
+        self._ensure_index()
+        entry, candidates = find_entry(self.entries, target, index=self._search_index)
+        if entry is None:
+            if candidates:
+                names = "\n".join(f"  {e.name}\t{e.id}" for e in candidates)
+                return {"ok": False, "message": f"'{target}' に一致する項目が複数あります:\n{names}"}
+            return {"ok": False, "message": f"'{target}' が見つかりません"}
+        if not self._run_entry(entry):
+            return {"ok": False, "message": f"『{entry.name}』を起動できませんでした"}
+        return {"ok": True, "message": f"『{entry.name}』を起動しています"}
+
+    def _add_command(self, command: dict) -> dict:
+        path = str(command.get("path", ""))
         if not os.path.exists(path):
-            QMessageBox.warning(self, "起動失敗", "ファイルが見つかりません。編集で修正してください。")
+            return {"ok": False, "message": f"ファイルが見つかりません: {path}"}
+        entry = LauncherEntry.from_file(path)
+        entry.name = str(command.get("name") or entry.name)
+        entry.description = str(command.get("description") or "")
+        row = self.model.rowCount()
+        category = command.get("category")
+        if category:
+            row = category_end(self.entries, str(category))
+            if row < 0:
+                return {"ok": False, "message": f"カテゴリ '{category}' がありません"}
+        self.model.insert_entry(row, entry)
+        self._record({"op": "add", "index": row, "entry": entry.to_dict()})
+        return {"ok": True, "id": entry.id, "message": f"『{entry.name}』を追加しました"}
+
+    def _category_entries(self, separator: LauncherEntry) -> List[LauncherEntry]:
+        """Apps between the separator and the next one, in catalog order"""
+        row = self.model.row_of(separator.id)
+        result = []
+        for e in self.model.entries()[row + 1:]:
+            if e.entry_type == "separator":
+                break
+            result.append(e)
+        return result
+
+    def _launch_category(self, separator: LauncherEntry):
+        if not self._check_loaded():
             return
-        ext = os.path.splitext(path)[1].lower()
-        cwd = os.path.dirname(path) or None
-        try:
-            if ext in (".py", ".pyw"):
-                # 新しいCMDウィンドウでPythonスクリプトを実行
-                # Use list format to avoid shell injection
-                if cwd:
-                    subprocess.Popen(
-                        ["cmd", "/k", f"cd /d {cwd} && python \"{path}\" && pause"],
-                        creationflags=subprocess.CREATE_NEW_CONSOLE if sys.platform.startswith("win") else 0
-                    )
-                else:
-                    subprocess.Popen(
-                        ["cmd", "/k", f"python \"{path}\" && pause"],
-                        creationflags=subprocess.CREATE_NEW_CONSOLE if sys.platform.startswith("win") else 0
-                    )
-            elif ext in (".exe", ".bat", ".cmd"):
-                # 新しいCMDウィンドウで実行ファイルを実行
-                if cwd:
-                    subprocess.Popen(
-                        ["cmd", "/k", f"cd /d {cwd} && \"{path}\" && pause"],
-                        creationflags=subprocess.CREATE_NEW_CONSOLE if sys.platform.startswith("win") else 0
-                    )
-                else:
-                    subprocess.Popen(
-                        ["cmd", "/k", f"\"{path}\" && pause"],
-                        creationflags=subprocess.CREATE_NEW_CONSOLE if sys.platform.startswith("win") else 0
-                    )
-            else:
-                # その他のファイルはシステムデフォルトで開く
-                if sys.platform.startswith("win"):
-                    os.startfile(path)  # type: ignore[attr-defined]
-                else:
-                    subprocess.Popen([path], cwd=cwd)
-        except Exception as e:
-            QMessageBox.critical(self, "起動エラー", f"起動に失敗しました:\n{e}")
+        entries = self._category_entries(separator)
+        if not entries:
+            self.statusBar().showMessage(f"『{separator.name}』に起動できる項目がありません", 2000)
+            return
+        order = self.settings["batch_order"]
+        if order == "reverse":
+            entries.reverse()
+        elif order == "frecency":
+            now = time.time()
+            entries.sort(key=lambda e: -self.history.score(e, now))
+        elif order == "name":
+            entries.sort(key=lambda e: e.name.lower())
+        batch = BatchLauncher(separator.name, entries, self._start_entry, self._launcher,
+                              max_concurrent=self.settings["batch_max_concurrent"],
+                              stagger_ms=self.settings["batch_stagger_ms"], parent=self)
+        batch.progress.connect(
+            lambda done, total: self.statusBar().showMessage(f"『{separator.name}』を起動中… {done}/{total}"))
+        batch.finished.connect(self._on_batch_finished)
+        batch.finished.connect(batch.deleteLater)
+        batch.start()
+
+    def _on_batch_finished(self, report: BatchReport):
+        summary = f"『{report.title}』: {len(report.started)} 件起動"
+        if report.skipped:
+            summary += f"、{len(report.skipped)} 件は起動処理中のためスキップ"
+        if not report.failed:
+            self.statusBar().showMessage(summary, 5000)
+            return
+        summary += f"、{len(report.failed)} 件失敗"
+        self.statusBar().showMessage(summary, 10000)
+        box = QMessageBox(QMessageBox.Warning, "一括起動", summary + "しました。", QMessageBox.Ok, self)
+        box.setDetailedText("\n".join(f"{name}: {error}" for name, error in report.failed))
+        box.setModal(False)
+        box.setAttribute(Qt.WA_DeleteOnClose)
+        box.show()
+
+    def _on_launch_finished(self, entry: LauncherEntry, proc, error: str):
+        for model in (self.model, self._results):
+            model.set_pending(entry, False)
+        if not self._launcher.busy:
+            self._spin_timer.stop()
+        self._record_launch(entry, not error)
+        if proc is not None:
+            self._supervisor.track(entry, proc)
+        if error:
+            self._health.invalidate(entry.path)
+            # Non-modal: the user may already be launching something else
+            self.statusBar().showMessage(f"『{entry.name}』の起動に失敗しました: {error}", 10000)
+        else:
+            self.statusBar().showMessage(f"『{entry.name}』を起動しました", 2000)
+
+    def _on_process_status(self, entry: LauncherEntry, status: ProcessStatus):
+        for model in (self.model, self._results):
+            model.set_status(entry, status)
+
+    def _stop_entry(self, entry: LauncherEntry, restart: bool = False):
+        if self._supervisor.terminate(entry, restart=restart):
+            self.statusBar().showMessage(f"『{entry.name}』を{'再起動' if restart else '停止'}しています…", 3000)
+        elif restart:
+            self._run_entry(entry)
+
+    def _record_launch(self, entry: LauncherEntry, success: bool):
+        self.history.record(entry, success)
+        if self.most_used_btn.isChecked() and not self._searching():
+            self._schedule_search()
 
 
 def main():
     # Windows環境でコンソール文字化け対策
     if sys.platform.startswith("win"):
-        import locale
         import codecs
         try:
             # コンソールのエンコーディングをUTF-8に設定
@@ -863,9 +2582,21 @@ def main():
             except Exception:
                 pass
 
+    command = launcher_ipc.command_from_argv(sys.argv[1:]) or {"cmd": "show"}
     app = QApplication(sys.argv)
+    server = InstanceServer()
+    if not server.listen():
+        # Another instance started at the same moment and won; hand the command to it after all
+        reply = launcher_ipc.send_command(command)
+        if reply is not None:
+            sys.exit(launcher_ipc.report(reply))
+        print(f"コマンドの受付を開始できません: {server.errorString()}", file=sys.stderr)
+    app.aboutToQuit.connect(server.shutdown)
     w = MainWindow()
+    server.commandReceived.connect(w.handle_command)
     w.show()
+    if command["cmd"] != "show":
+        w.handle_command(command, lambda _reply: None)  # the window's status bar reports it
     sys.exit(app.exec())
 
 
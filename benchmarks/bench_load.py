@@ -0,0 +1,76 @@
+"""Catalog load benchmark: python benchmarks/bench_load.py [sizes...]
+
+Times the full decode (load_catalog) and the first page of the incremental stream the window
+uses, with the stdlib json module and with the optional fast codec when one is installed.
+Runs against a throwaway HOME, so the real ~/.launcher is never touched.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+os.environ["HOME"] = os.environ["USERPROFILE"] = tempfile.mkdtemp(prefix="launcher-bench-")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import launcher_core as lm  # noqa: E402
+from Launcher_main import LOAD_PAGE_SIZE  # noqa: E402
+
+
+def make_catalog(n: int) -> None:
+    entries = []
+    for i in range(n):
+        if i % 20 == 0:
+            entries.append(lm.LauncherEntry.create_separator(f"Category {i // 20}"))
+        else:
+            entries.append(lm.LauncherEntry(
+                id=str(uuid.uuid4()),
+                name=f"Tool {i}",
+                path=f"C:\\Tools\\tool_{i}\\tool_{i}.exe",
+                description=f"Description of tool number {i}",
+            ))
+    lm.save_entries(entries)
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1000
+
+
+def first_page() -> None:
+    next(lm.JsonCatalogStream(lm._data_file()).pages(LOAD_PAGE_SIZE), None)
+
+
+def run(codec: str, sizes) -> None:
+    if codec == "json":
+        saved = lm._orjson, lm.FAST_JSON_CODEC
+        lm._orjson, lm.FAST_JSON_CODEC = None, None
+    try:
+        for n in sizes:
+            make_catalog(n)
+            repeat = 5 if n <= 10_000 else 2
+            full = best_of(lm.load_catalog, repeat)
+            page = best_of(first_page, repeat)
+            print(f"{codec:8} {n:>8} {full:12.1f} {page:16.1f}")
+    finally:
+        if codec == "json":
+            lm._orjson, lm.FAST_JSON_CODEC = saved
+
+
+def main() -> None:
+    sizes = [int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    print(f"{'codec':8} {'entries':>8} {'full (ms)':>12} {'first page (ms)':>16}")
+    run("json", sizes)
+    if lm.FAST_JSON_CODEC is not None:
+        run(lm.FAST_JSON_CODEC, sizes)
+
+
+if __name__ == "__main__":
+    main()
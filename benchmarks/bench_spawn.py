@@ -0,0 +1,90 @@
+"""Spawn latency benchmark: python benchmarks/bench_spawn.py [runs]
+
+Compares the old shell-wrapped launch (a shell that changes directory and then runs the
+program, as cmd /k "cd /d ... && ..." did) with the direct argv path (spawn_spec), and on
+POSIX with os.posix_spawn for reference (it cannot set a working directory, so it is not
+used for launching). Each run starts a trivial program; "start" is the time until the
+spawn call returns, "total" until the child has exited.
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ["HOME"] = os.environ["USERPROFILE"] = tempfile.mkdtemp(prefix="launcher-bench-")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import launcher_core as lm  # noqa: E402
+
+WINDOWS = sys.platform.startswith("win")
+
+
+def make_target() -> str:
+    directory = tempfile.mkdtemp(prefix="launcher-bench-")
+    if WINDOWS:
+        # A tiny console program that exits immediately
+        return os.path.join(os.environ.get("SystemRoot", r"C:\Windows"), "System32", "whoami.exe")
+    path = os.path.join(directory, "noop")
+    os.symlink("/bin/true", path)
+    return path
+
+
+def shell_wrapped(path: str) -> subprocess.Popen:
+    cwd = os.path.dirname(path)
+    if WINDOWS:
+        # /c instead of /k so the shell exits and can be waited for
+        return subprocess.Popen(["cmd", "/c", f"cd /d {cwd} && \"{path}\""], stdout=subprocess.DEVNULL)
+    return subprocess.Popen(["sh", "-c", f"cd \"{cwd}\" && \"{path}\""])
+
+
+def direct(path: str) -> subprocess.Popen:
+    spec = lm.resolve_launch(lm.LauncherEntry(id="bench", name="bench", path=path))
+    spec.new_console = False  # keep the benchmark from opening windows
+    return lm.spawn_spec(spec, check=False)
+
+
+class _Spawned:
+    def __init__(self, pid: int):
+        self.pid = pid
+
+    def wait(self) -> None:
+        os.waitpid(self.pid, 0)
+
+
+def posix_spawn(path: str) -> _Spawned:
+    return _Spawned(os.posix_spawn(path, [path], os.environ))
+
+
+def measure(fn, path: str, runs: int):
+    start, total = [], []
+    for _ in range(runs):
+        t = time.perf_counter()
+        proc = fn(path)
+        started = time.perf_counter()
+        proc.wait()
+        done = time.perf_counter()
+        start.append((started - t) * 1000)
+        total.append((done - t) * 1000)
+    return statistics.median(start), statistics.median(total)
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    path = make_target()
+    strategies = [("shell-wrapped", shell_wrapped), ("direct (spawn_spec)", direct)]
+    if hasattr(os, "posix_spawn"):
+        strategies.append(("os.posix_spawn", posix_spawn))
+    print(f"{'strategy':22} {'start (ms)':>11} {'total (ms)':>11}   median of {runs}")
+    for name, fn in strategies:
+        fn(path).wait()  # warm up
+        start, total = measure(fn, path, runs)
+        print(f"{name:22} {start:11.2f} {total:11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Command line front end for the launcher catalog; never imports PySide6
+
+    python launcher_cli.py list [--json]
+    python launcher_cli.py run <name|id> [--wait]
+    python launcher_cli.py add <path> [--name N] [--description D] [--category C]
+    python launcher_cli.py export [--format json|csv] [-o FILE]
+
+It reads and writes the same ~/.launcher data as the window, through launcher_core. While the
+window is running, run (without --wait) and add are handed to it over launcher_ipc instead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from typing import Iterator, List, Optional, Tuple
+
+import launcher_core as core
+import launcher_ipc
+
+
+def _categorized(entries: List[core.LauncherEntry]) -> Iterator[Tuple[str, core.LauncherEntry]]:
+    """(category, entry) for every app; apps before the first separator have category "" """
+    category = ""
+    for e in entries:
+        if e.entry_type == "separator":
+            category = e.name
+        else:
+            yield category, e
+
+
+def cmd_list(args, settings: dict) -> int:
+    entries = core.open_storage(settings).load().entries
+    if args.json:
+        json.dump([e.to_dict() for e in entries], sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+    for e in entries:
+        if e.entry_type == "separator":
+            print(f"[{e.name}]")
+        else:
+            print(f"  {e.name}\t{e.path}\t{e.id}")
+    return 0
+
+
+def cmd_run(args, settings: dict) -> int:
+    if not args.wait:
+        # The running window launches it, so it shows up there (status, history, ranking)
+        reply = launcher_ipc.send_command({"cmd": "run", "target": args.target})
+        if reply is not None:
+            return launcher_ipc.report(reply)
+    entries = core.open_storage(settings).load().entries
+    entry, candidates = core.find_entry(entries, args.target)
+    if entry is None:
+        if candidates:
+            print(f"'{args.target}' に一致する項目が複数あります:", file=sys.stderr)
+            for e in candidates:
+                print(f"  {e.name}\t{e.id}", file=sys.stderr)
+        else:
+            print(f"'{args.target}' が見つかりません", file=sys.stderr)
+        return 2
+
+    history = core.LaunchHistory(half_life_days=settings["frecency_half_life_days"])
+    try:
+        proc = core.spawn_spec(core.resolve_launch(entry))
+    except Exception as e:
+        history.record(entry, False)
+        print(f"『{entry.name}』の起動に失敗しました: {e}", file=sys.stderr)
+        return 1
+    history.record(entry, True)
+    if args.wait and proc is not None:
+        return proc.wait()
+    return 0
+
+
+def cmd_add(args, settings: dict) -> int:
+    path = os.path.abspath(args.path)
+    # A running window owns the catalog: let it add the entry so the two never race on the files
+    reply = launcher_ipc.send_command({"cmd": "add", "path": path, "name": args.name or "",
+                                       "description": args.description or "", "category": args.category or ""})
+    if reply is not None:
+        if reply.get("ok"):
+            print(reply["id"])
+            return 0
+        return launcher_ipc.report(reply)
+
+    entry = core.LauncherEntry.from_file(path)
+    if args.name:
+        entry.name = args.name
+    if args.description:
+        entry.description = args.description
+    storage = core.open_storage(settings)
+    for attempt in range(3):
+        catalog = storage.load()
+        index = len(catalog.entries)
+        if args.category:
+            index = core.category_end(catalog.entries, args.category)
+            if index < 0:
+                print(f"カテゴリ '{args.category}' がありません", file=sys.stderr)
+                return 2
+        op = {"op": "add", "index": index, "entry": entry.to_dict(), "seq": catalog.seq + 1}
+        try:
+            if catalog.torn:
+                # Nothing after a partial record replays, so fold the add into a snapshot (as the window does)
+                core.apply_op(catalog.entries, op)
+                storage.snapshot(catalog.entries, op["seq"], [op])
+            else:
+                # The same operation the window journals, so it replays on the next load
+                storage.append([op])
+            break
+        except core.ExternalChangeError as e:
+            # Someone wrote in between loading and appending: recompute against their version
+            if attempt == 2:
+                print(f"追加できませんでした: {e}", file=sys.stderr)
+                return 1
+    print(entry.id)
+    return 0
+
+
+_CSV_FIELDS = ("category", "id", "name", "path", "description", "console", "args", "cwd", "interpreter", "nice")
+
+
+def cmd_export(args, settings: dict) -> int:
+    entries = core.open_storage(settings).load().entries
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        if args.format == "json":
+            # Same shape as launcher_data.json, so an export can be dropped back in place
+            json.dump({"entries": [e.to_dict() for e in entries]}, out, ensure_ascii=False, indent=2)
+            out.write("\n")
+        else:
+            import csv
+
+            writer = csv.writer(out)
+            writer.writerow(_CSV_FIELDS)
+            for category, e in _categorized(entries):
+                p = e.profile or core.LaunchProfile()
+                writer.writerow([category, e.id, e.name, e.path, e.description, int(e.console),
+                                 p.args, p.cwd, p.interpreter, p.nice])
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="launcher", description="ランチャーのカタログをコマンドラインから操作します")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("list", help="項目を一覧表示")
+    p.add_argument("--json", action="store_true", help="JSONで出力")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("run", help="項目を起動")
+    p.add_argument("target", help="項目の名前またはID")
+    p.add_argument("--wait", action="store_true", help="終了まで待ち、その終了コードを返す")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("add", help="項目を追加")
+    p.add_argument("path")
+    p.add_argument("--name")
+    p.add_argument("--description")
+    p.add_argument("--category", help="追加先のカテゴリ名（省略時は末尾）")
+    p.set_defaults(func=cmd_add)
+
+    p = sub.add_parser("export", help="カタログを書き出し")
+    p.add_argument("--format", choices=("json", "csv"), default="json")
+    p.add_argument("-o", "--output", help="出力ファイル（省略時は標準出力）")
+    p.set_defaults(func=cmd_export)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if sys.platform.startswith("win"):
+        # Windows環境でコンソール文字化け対策
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.reconfigure(encoding="utf-8")
+            except (AttributeError, ValueError):
+                pass
+    if args.command == "add" and not os.path.exists(args.path):
+        print(f"ファイルが見つかりません: {args.path}", file=sys.stderr)
+        return 1
+    return args.func(args, core.load_settings())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
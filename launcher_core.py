@@ -0,0 +1,1860 @@
+"""GUI-free launcher core: catalog storage, search, launch history and launching
+
+Launcher_main.py (the Qt window) and launcher_cli.py are both built on this module.
+It must never import PySide6, so scripts can use the catalog without starting Qt.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import gc
+import heapq
+import itertools
+import json
+import math
+import os
+import re
+import shlex
+import shutil
+import struct
+import sys
+import threading
+import time
+import subprocess
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# gzip, hashlib, sqlite3, tempfile, uuid and concurrent.futures are imported where they are
+# used: launcher_cli.py loads this module on every invocation and most commands need none of them.
+
+
+# -----------------------------
+# Storage and model
+# -----------------------------
+
+
+# Optional faster JSON decoders; the stdlib json module is the fallback
+try:
+    import orjson as _orjson
+
+    FAST_JSON_CODEC: Optional[str] = "orjson"
+except ImportError:
+    _orjson = None
+    try:
+        import msgspec as _msgspec
+
+        FAST_JSON_CODEC = "msgspec"
+    except ImportError:
+        _msgspec = None
+        FAST_JSON_CODEC = None
+
+
+def _json_loads(raw: bytes):
+    if _orjson is not None:
+        return _orjson.loads(raw)
+    if FAST_JSON_CODEC == "msgspec":
+        return _msgspec.json.decode(raw)
+    return json.loads(raw.decode("utf-8"))
+
+
+def _app_data_dir() -> str:
+    home = os.path.expanduser("~")
+    path = os.path.join(home, ".launcher")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _data_file() -> str:
+    return os.path.join(_app_data_dir(), "launcher_data.json")
+
+
+DEFAULT_SETTINGS = {
+    # Mutations are coalesced and written at most once per this many milliseconds
+    "save_interval_ms": 500,
+    # Number of distinct saved states kept in ~/.launcher/backups
+    "backup_generations": 10,
+    # The journal is folded into a fresh snapshot (and backup) after this many operations
+    "journal_compact_ops": 200,
+    # "json" (launcher_data.json + journal) or "sqlite" (launcher.db)
+    "storage": "json",
+    # A launch counts half as much for frecency ranking after this many days
+    "frecency_half_life_days": 14,
+    # Keep idle Python interpreters ready so .py/.pyw entries start without interpreter startup.
+    # prewarm_preload maps an entry id or path to modules imported ahead of time for it.
+    "prewarm_enabled": False,
+    "prewarm_size": 2,
+    "prewarm_preload": {},
+    # Seconds a background path-existence check stays valid (local folders are also watched)
+    "path_check_ttl_s": 300,
+    # How often launched processes are checked for exit and CPU/memory use
+    "process_poll_ms": 1000,
+    # "Launch all in category": launches in flight at once, minimum gap between starts,
+    # and order ("catalog", "reverse", "frecency" or "name")
+    "batch_max_concurrent": 3,
+    "batch_stagger_ms": 250,
+    "batch_order": "catalog",
+}
+
+
+def _settings_file() -> str:
+    return os.path.join(_app_data_dir(), "settings.json")
+
+
+def load_settings() -> dict:
+    """Settings from ~/.launcher/settings.json layered over DEFAULT_SETTINGS"""
+    settings = dict(DEFAULT_SETTINGS)
+    try:
+        with open(_settings_file(), "r", encoding="utf-8") as f:
+            user = json.load(f)
+        if isinstance(user, dict):
+            settings.update(user)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"settings.json を読み込めません: {e}", file=sys.stderr)
+    return settings
+
+
+def id_key(entry_id: str):
+    """Compact form of an id: 16 raw bytes for a canonical lowercase UUID, else the string itself"""
+    if len(entry_id) == 36 and entry_id[8] == entry_id[13] == entry_id[18] == entry_id[23] == "-":
+        digits = entry_id.replace("-", "")
+        # Only take ids that format back identically (lowercase, nothing but hex digits)
+        if len(digits) == 32 and digits == digits.lower():
+            try:
+                key = bytes.fromhex(digits)
+            except ValueError:
+                return entry_id
+            if len(key) == 16:
+                return key
+    return entry_id
+
+
+def _new_id() -> str:
+    import uuid
+
+    return str(uuid.uuid4())
+
+
+def _id_from_key(key) -> str:
+    if isinstance(key, bytes):
+        h = key.hex()
+        return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+    return key
+
+
+@dataclass(frozen=True)
+class LaunchProfile:
+    """Optional per-entry launch settings; replaced as a whole on edit, never mutated
+
+    args is an argument template split like a shell command line (quotes group, backslashes
+    are literal), with {path}, {dir} and {name} replaced per argument. An env value of ""
+    removes the variable. interpreter is a python executable or a venv directory and only
+    applies to .py/.pyw. nice is a POSIX nice increment, mapped to a priority class on Windows.
+    """
+
+    args: str = ""
+    env: Dict[str, str] = field(default_factory=dict)
+    cwd: str = ""
+    interpreter: str = ""
+    nice: int = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.args or self.env or self.cwd or self.interpreter or self.nice)
+
+    def to_dict(self) -> dict:
+        d = {}
+        if self.args:
+            d["args"] = self.args
+        if self.env:
+            d["env"] = dict(self.env)
+        if self.cwd:
+            d["cwd"] = self.cwd
+        if self.interpreter:
+            d["interpreter"] = self.interpreter
+        if self.nice:
+            d["nice"] = self.nice
+        return d
+
+    @staticmethod
+    def from_dict(d: dict) -> "LaunchProfile":
+        """Raises TypeError/ValueError on malformed input"""
+        env = d.get("env") or {}
+        if not isinstance(env, dict) or not all(isinstance(k, str) and isinstance(v, str) for k, v in env.items()):
+            raise TypeError("env must map strings to strings")
+        for key in ("args", "cwd", "interpreter"):
+            if not isinstance(d.get(key, ""), str):
+                raise TypeError(f"{key} must be a string")
+        nice = d.get("nice", 0)
+        if type(nice) is not int:
+            raise TypeError("nice must be an integer")
+        split_args(d.get("args", ""), "")  # ValueError for a template shlex cannot split
+        return LaunchProfile(d.get("args", ""), dict(env), d.get("cwd", ""), d.get("interpreter", ""), nice)
+
+
+class LauncherEntry:
+    """One catalog row. Slotted, with the id kept as 16 bytes, because catalogs can be large
+
+    entry_type is "app" or "separator" and is interned, so every instance shares two strings.
+    """
+
+    __slots__ = ("key", "name", "path", "description", "_entry_type", "console", "profile")
+
+    def __init__(self, id: str, name: str, path: str, description: str = "", entry_type: str = "app",
+                 console: bool = False, profile=None):
+        self.key = id_key(id)  # what indexes are keyed by
+        self.name = name
+        self.path = path
+        self.description = description
+        self._entry_type = sys.intern(entry_type)
+        self.console = console  # run inside a console window that stays open (opt-in)
+        if isinstance(profile, dict):
+            profile = LaunchProfile.from_dict(profile)
+        elif profile is not None and profile.__class__ is not LaunchProfile:
+            # Also sends such rows off _build_entries' fast path, to be reported by _entry_problem
+            raise TypeError("profile must be a LaunchProfile or a dict")
+        self.profile: Optional[LaunchProfile] = profile or None
+
+    @property
+    def id(self) -> str:
+        return _id_from_key(self.key)
+
+    @id.setter
+    def id(self, value: str) -> None:
+        self.key = id_key(value)
+
+    @property
+    def entry_type(self) -> str:
+        return self._entry_type
+
+    @entry_type.setter
+    def entry_type(self, value: str) -> None:
+        self._entry_type = sys.intern(value)
+
+    def to_dict(self) -> dict:
+        """JSON form; optional fields are only written when set, so older files stay unchanged"""
+        d = {
+            "id": self.id,
+            "name": self.name,
+            "path": self.path,
+            "description": self.description,
+            "entry_type": self._entry_type,
+        }
+        if self.console:
+            d["console"] = True
+        if self.profile:
+            d["profile"] = self.profile.to_dict()
+        return d
+
+    def assign(self, other: "LauncherEntry") -> None:
+        """Take over every field of other (used to apply an update in place)"""
+        for slot in LauncherEntry.__slots__:
+            setattr(self, slot, getattr(other, slot))
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in LauncherEntry.__slots__)
+
+    __hash__ = None  # mutable, like the dataclass it replaces
+
+    def __repr__(self) -> str:
+        return (f"LauncherEntry(id={self.id!r}, name={self.name!r}, path={self.path!r}, "
+                f"description={self.description!r}, entry_type={self._entry_type!r}"
+                + (", console=True" if self.console else "")
+                + (f", profile={self.profile!r}" if self.profile else "") + ")")
+
+    @staticmethod
+    def from_file(filepath: str) -> "LauncherEntry":
+        base = os.path.splitext(os.path.basename(filepath))[0]
+        return LauncherEntry(
+            id=_new_id(),
+            name=base,
+            path=os.path.abspath(filepath),
+            description="",
+            entry_type="app",
+        )
+
+    @staticmethod
+    def create_separator(name: str) -> "LauncherEntry":
+        return LauncherEntry(
+            id=_new_id(),
+            name=name,
+            path="",
+            description="",
+            entry_type="separator",
+        )
+
+
+def _journal_file() -> str:
+    return os.path.join(_app_data_dir(), "launcher_data.journal")
+
+
+def entry_from_dict(it: dict) -> LauncherEntry:
+    """LauncherEntry from a saved dict (to_dict's shape), with defaults for missing fields"""
+    return LauncherEntry(
+        id=it.get("id") or _new_id(),  # only mint a uuid when the id is missing
+        name=it.get("name", ""),
+        path=it.get("path", ""),
+        description=it.get("description", ""),
+        entry_type=it.get("entry_type", "app"),
+        console=it.get("console", False),
+        profile=it.get("profile"),
+    )
+
+
+def _entry_problem(it) -> Optional[str]:
+    """Why a stored item cannot become a LauncherEntry, or None if it can"""
+    if not isinstance(it, dict):
+        return "オブジェクトではありません"
+    for key in ("id", "name", "path", "description", "entry_type"):
+        value = it.get(key)
+        if value is not None and not isinstance(value, str):
+            return f"{key} が文字列ではありません"
+    if not isinstance(it.get("console", False), bool):
+        return "console が真偽値ではありません"
+    profile = it.get("profile")
+    if profile is not None:
+        if not isinstance(profile, dict):
+            return "profile がオブジェクトではありません"
+        try:
+            LaunchProfile.from_dict(profile)
+        except (TypeError, ValueError) as e:
+            return f"profile が不正です ({e})"
+    return None
+
+
+def _build_entries(items: list, problems: List[str], base: int = 0) -> List[LauncherEntry]:
+    """Build entries in bulk; malformed items are skipped and described in problems
+
+    base is the position of items[0] in the file, for the problem messages.
+    """
+    # Allocating many objects at once sets off repeated cyclic GC passes that find nothing
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        # Fast path: complete, well-typed records, which is what save_entries writes
+        result = [LauncherEntry(it["id"], it["name"], it["path"], it["description"], it["entry_type"],
+                                it.get("console", False), it.get("profile"))
+                  for it in items]
+        # An empty id is not fast-path material: the slow path mints a fresh uuid for it
+        if all(e.key and type(e.name) is str and type(e.path) is str and type(e.description) is str
+               and e.console.__class__ is bool for e in result):
+            return result
+    except (KeyError, TypeError, AttributeError, ValueError):
+        pass
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    result = []
+    for n, it in enumerate(items, start=base):
+        problem = _entry_problem(it)
+        if problem is None:
+            result.append(entry_from_dict(it))
+        else:
+            name = it.get("name") if isinstance(it, dict) else None
+            problems.append(f"#{n + 1}" + (f" ({name})" if isinstance(name, str) and name else "") + f": {problem}")
+    return result
+
+
+def _check_snapshot(data) -> list:
+    """Validate the document shape once; returns the entries list"""
+    if not isinstance(data, dict):
+        raise ValueError("top level is not an object")
+    items = data["entries"]
+    if not isinstance(items, list):
+        raise ValueError("'entries' is not a list")
+    return items
+
+
+def _parse_snapshot(raw: bytes, problems: Optional[List[str]] = None) -> Tuple[List[LauncherEntry], int]:
+    """Parse a data payload into (entries, journal seq); raises if it is not launcher data"""
+    data = _json_loads(raw)
+    items = _check_snapshot(data)
+    return _build_entries(items, problems if problems is not None else []), int(data.get("seq", 0))
+
+
+def _parse_entries(raw: bytes) -> List[LauncherEntry]:
+    return _parse_snapshot(raw)[0]
+
+
+@dataclass
+class LoadedCatalog:
+    entries: List[LauncherEntry]
+    seq: int = 0  # seq of the last journal operation reflected in entries
+    history: List[dict] = field(default_factory=list)  # journal operations replayed onto the snapshot
+    torn: bool = False  # the journal ended in a partial record
+    problems: List[str] = field(default_factory=list)  # malformed entries that were skipped
+    unreadable: bool = False  # the data file did not parse
+    recovered: bool = False  # ... and a backup was loaded in its place (otherwise entries holds only the journal)
+
+
+def _read_journal() -> Tuple[List[dict], bool]:
+    """Operations in the journal, plus whether it ends in a torn (partially written) record"""
+    try:
+        with open(_journal_file(), "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return [], False
+    ops: List[dict] = []
+    for line in raw.split(b"\n"):
+        if not line.strip():
+            continue
+        try:
+            ops.append(json.loads(line.decode("utf-8")))
+        except Exception:
+            # Everything after a damaged record is untrustworthy
+            return ops, True
+    return ops, False
+
+
+def load_catalog() -> LoadedCatalog:
+    """Load the snapshot and replay the journal onto it"""
+    entries: List[LauncherEntry] = []
+    seq = 0
+    problems: List[str] = []
+    unreadable = recovered = False
+    fp = _data_file()
+    if os.path.exists(fp):
+        try:
+            with open(fp, "rb") as f:
+                entries, seq = _parse_snapshot(f.read(), problems)
+        except Exception:
+            # Primary file is corrupt (e.g. a crash mid-write): use the newest backup that parses
+            problems.clear()
+            unreadable = True
+            for backup in get_backup_generations():
+                try:
+                    entries, seq = _parse_snapshot(read_backup(backup["generation"]), problems)
+                    recovered = True
+                    break
+                except Exception:
+                    continue
+
+    ops, torn = _read_journal()
+    history: List[dict] = []
+    for op in ops:
+        op_seq = op.get("seq", 0)
+        if op_seq <= seq:
+            continue  # already part of the snapshot
+        if apply_op(entries, op):
+            history.append(op)
+        seq = op_seq
+    return LoadedCatalog(entries, seq, history, torn, problems, unreadable, recovered)
+
+
+def load_entries() -> List[LauncherEntry]:
+    return load_catalog().entries
+
+
+class CorruptCatalogError(ValueError):
+    """The catalog could not be read incrementally"""
+
+
+class CatalogStream(ABC):
+    """Reads a catalog incrementally: iterate pages() first, then call journal()"""
+
+    seq = 0  # valid once pages() is exhausted
+
+    def __init__(self):
+        self.problems: List[str] = []  # malformed entries skipped so far
+
+    @abstractmethod
+    def pages(self, page_size: int) -> Iterator[List[LauncherEntry]]:
+        """Entries in catalog order, at most page_size at a time"""
+
+    def journal(self) -> Tuple[List[dict], bool]:
+        """Operations newer than the snapshot still to be replayed, and whether the journal is torn"""
+        return [], False
+
+
+_WS = re.compile(r"\s*")
+
+
+class JsonCatalogStream(CatalogStream):
+    """Builds entries from launcher_data.json a page at a time
+
+    With orjson/msgspec the document is decoded in one (fast) call and only entry construction
+    is paged; with the stdlib codec it is decoded one entry object at a time with raw_decode.
+    """
+
+    def __init__(self, fp: str):
+        super().__init__()
+        self._fp = fp
+
+    def pages(self, page_size: int) -> Iterator[List[LauncherEntry]]:
+        try:
+            with open(self._fp, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            raise CorruptCatalogError(str(e)) from e
+        if FAST_JSON_CODEC is None:
+            yield from self._pages_incremental(raw, page_size)
+            return
+        # The first page is cheaper to pick off incrementally than to wait for a full decode
+        head = self._pages_incremental(raw, page_size)
+        first = next(head, None)
+        head.close()
+        if first is None:
+            return
+        yield first
+        yield from self._pages_decoded(raw, page_size, skip=page_size)
+
+    def _pages_decoded(self, raw: bytes, page_size: int, skip: int = 0) -> Iterator[List[LauncherEntry]]:
+        try:
+            data = _json_loads(raw)
+            items = _check_snapshot(data)
+            self.seq = int(data.get("seq", 0))
+        except Exception as e:
+            raise CorruptCatalogError(str(e)) from e
+        for start in range(skip, len(items), page_size):
+            yield _build_entries(items[start:start + page_size], self.problems, start)
+
+    def _pages_incremental(self, raw: bytes, page_size: int) -> Iterator[List[LauncherEntry]]:
+        try:
+            text = raw.decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise CorruptCatalogError(str(e)) from e
+
+        start = re.search(r'"entries"\s*:\s*\[', text)
+        if start is None:
+            raise CorruptCatalogError("no entries array")
+        seq = re.search(r'"seq"\s*:\s*(\d+)', text[: start.start()])
+        decoder = json.JSONDecoder()
+        pos = _WS.match(text, start.end()).end()
+        page: list = []
+        done = 0
+        if text.startswith("]", pos):
+            pos += 1
+        else:
+            while True:
+                try:
+                    obj, pos = decoder.raw_decode(text, pos)
+                except ValueError as e:
+                    raise CorruptCatalogError(str(e)) from e
+                page.append(obj)
+                if len(page) >= page_size:
+                    yield _build_entries(page, self.problems, done)
+                    done += len(page)
+                    page = []
+                pos = _WS.match(text, pos).end()
+                if text.startswith(",", pos):
+                    pos = _WS.match(text, pos + 1).end()
+                elif text.startswith("]", pos):
+                    pos += 1
+                    break
+                else:
+                    raise CorruptCatalogError(f"unexpected data at offset {pos}")
+
+        tail = text[pos:]
+        if not tail.strip().endswith("}"):
+            raise CorruptCatalogError("truncated after entries")
+        seq = seq or re.search(r'"seq"\s*:\s*(\d+)', tail)
+        self.seq = int(seq.group(1)) if seq else 0
+        if page:
+            yield _build_entries(page, self.problems, done)
+
+    def journal(self) -> Tuple[List[dict], bool]:
+        ops, torn = _read_journal()
+        return [op for op in ops if op.get("seq", 0) > self.seq], torn
+
+
+def _locate(entries: List[LauncherEntry], entry_id: str, hint: int) -> int:
+    key = id_key(entry_id)
+    if 0 <= hint < len(entries) and entries[hint].key == key:
+        return hint
+    for i, e in enumerate(entries):
+        if e.key == key:
+            return i
+    return -1
+
+
+def category_end(entries: List[LauncherEntry], category: str) -> int:
+    """Insert position at the end of the named category (before the next separator); -1 if there is none"""
+    start = next((i for i, e in enumerate(entries) if e.entry_type == "separator" and e.name == category), -1)
+    if start < 0:
+        return -1
+    return next((i for i in range(start + 1, len(entries)) if entries[i].entry_type == "separator"), len(entries))
+
+
+def apply_op(entries: List[LauncherEntry], op: dict) -> bool:
+    """Apply one journal operation to a plain entry list; False if it no longer applies
+
+    Operations:
+      {"op": "add", "index", "entry"}      {"op": "delete", "index", "entry"}
+      {"op": "update", "index", "before", "after"}      {"op": "move", "id", "from", "to"}
+    """
+    kind = op.get("op")
+    if kind == "add":
+        index = max(0, min(op.get("index", len(entries)), len(entries)))
+        entries.insert(index, entry_from_dict(op["entry"]))
+        return True
+    if kind == "delete":
+        i = _locate(entries, op["entry"]["id"], op.get("index", -1))
+        if i < 0:
+            return False
+        del entries[i]
+        return True
+    if kind == "update":
+        i = _locate(entries, op["after"]["id"], op.get("index", -1))
+        if i < 0:
+            return False
+        entries[i] = entry_from_dict(op["after"])
+        return True
+    if kind == "move":
+        i = _locate(entries, op["id"], op.get("from", -1))
+        if i < 0:
+            return False
+        e = entries.pop(i)
+        entries.insert(max(0, min(op["to"], len(entries))), e)
+        return True
+    return False
+
+
+def invert_op(op: dict) -> dict:
+    """The operation that undoes op"""
+    kind = op["op"]
+    if kind == "add":
+        return {"op": "delete", "index": op["index"], "entry": op["entry"]}
+    if kind == "delete":
+        return {"op": "add", "index": op["index"], "entry": op["entry"]}
+    if kind == "update":
+        return {"op": "update", "index": op.get("index", -1), "before": op["after"], "after": op["before"]}
+    if kind == "move":
+        return {"op": "move", "id": op["id"], "from": op["to"], "to": op["from"]}
+    raise ValueError(f"unknown operation {kind!r}")
+
+
+def append_journal(ops: List[dict]) -> None:
+    """Durably append operations to the journal in one write"""
+    payload = b"".join(json.dumps(op, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+                       for op in ops)
+    with open(_journal_file(), "ab") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _truncate_journal() -> None:
+    with open(_journal_file(), "wb"):
+        pass
+
+
+# Backups are gzip'd snapshots stored under their SHA-256, so identical states share one blob
+# and an unchanged save adds no generation. backups/index.json lists generations oldest first.
+
+
+def _backup_dir() -> str:
+    path = os.path.join(_app_data_dir(), "backups")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _backup_index_file() -> str:
+    return os.path.join(_backup_dir(), "index.json")
+
+
+def _backup_blob_path(digest: str) -> str:
+    return os.path.join(_backup_dir(), digest + ".json.gz")
+
+
+def _write_backup_index(generations: List[dict]) -> None:
+    payload = json.dumps({"generations": generations}, separators=(",", ":")).encode("utf-8")
+    # The index is only a catalogue of the blobs, so skip the fsync
+    _atomic_write(_backup_index_file(), payload, durable=False)
+
+
+def _put_backup_blob(payload: bytes) -> str:
+    import hashlib
+
+    digest = hashlib.sha256(payload).hexdigest()
+    blob = _backup_blob_path(digest)
+    if not os.path.exists(blob):
+        import gzip
+
+        _atomic_write(blob, gzip.compress(payload, compresslevel=6), durable=False)
+    return digest
+
+
+def _import_legacy_backups() -> List[dict]:
+    """Move launcher_data.json.bakN files (ring or rotation scheme) into the store"""
+    fp = _data_file()
+    legacy = []
+    for slot in range(1, 11):
+        path = f"{fp}.bak{slot}"
+        try:
+            legacy.append((os.path.getmtime(path), path))
+        except OSError:
+            continue
+    generations: List[dict] = []
+    for n, (mtime, path) in enumerate(sorted(legacy), start=1):
+        try:
+            with open(path, "rb") as f:
+                digest = _put_backup_blob(f.read())
+        except OSError:
+            continue
+        generations.append({"generation": n, "hash": digest, "time": mtime})
+    if generations:
+        _write_backup_index(generations)
+    for _, path in legacy:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    try:
+        os.remove(fp + ".bakidx")
+    except OSError:
+        pass
+    return generations
+
+
+def _load_backup_index() -> List[dict]:
+    """Backup generations, oldest first: [{"generation", "hash", "time"}]"""
+    try:
+        with open(_backup_index_file(), "r", encoding="utf-8") as f:
+            return list(json.load(f)["generations"])
+    except FileNotFoundError:
+        return _import_legacy_backups()
+    except Exception:
+        pass
+    # Index is unreadable: rebuild it from the blobs in age order
+    blobs = []
+    for name in os.listdir(_backup_dir()):
+        if name.endswith(".json.gz"):
+            path = os.path.join(_backup_dir(), name)
+            blobs.append((os.path.getmtime(path), name[: -len(".json.gz")]))
+    generations = [{"generation": n, "hash": digest, "time": mtime}
+                   for n, (mtime, digest) in enumerate(sorted(blobs), start=1)]
+    _write_backup_index(generations)
+    return generations
+
+
+def get_backup_generations() -> List[dict]:
+    """Available backups, newest first; each has generation, hash and time"""
+    return list(reversed(_load_backup_index()))
+
+
+def read_backup(generation: int) -> bytes:
+    """Rebuild the data payload of one backup generation from the store
+
+    Raises KeyError for an unknown generation and ValueError when the blob no longer matches
+    the hash it is stored under.
+    """
+    for g in _load_backup_index():
+        if g["generation"] == generation:
+            import gzip
+            import hashlib
+
+            with open(_backup_blob_path(g["hash"]), "rb") as f:
+                payload = gzip.decompress(f.read())
+            if hashlib.sha256(payload).hexdigest() != g["hash"]:
+                raise ValueError(f"backup generation {generation} is damaged")
+            return payload
+    raise KeyError(f"no backup generation {generation}")
+
+
+def backup_entries(generation: int) -> List[LauncherEntry]:
+    """Entries of one backup generation; raises if it is missing, damaged or not launcher data"""
+    return _parse_entries(read_backup(generation))
+
+
+def restore_from_backup(generation: int, backup_generations: int = 10,
+                        entries: Optional[List[LauncherEntry]] = None) -> bool:
+    """Make a backup generation the catalog; False if it cannot be read or is not launcher data
+
+    The backup is checked before anything is touched and then written as one atomic snapshot
+    whose seq is past every journal operation, so a journal left behind by a crash before it is
+    emptied cannot replay onto the restored catalog. entries, when given, are the generation's
+    already-read contents; the restore then no longer needs it to be in the store.
+    """
+    try:
+        if entries is None:
+            entries = backup_entries(generation)
+        save_entries(entries, backup_generations=backup_generations, seq=load_catalog().seq)
+        return True
+    except Exception:
+        return False
+
+
+def diff_entries(old: List[LauncherEntry], new: List[LauncherEntry]) -> Tuple[
+        List[LauncherEntry], List[LauncherEntry], List[Tuple[LauncherEntry, LauncherEntry]]]:
+    """(added, removed, changed) going from old to new, matched by id; changed pairs are (old, new)"""
+    before = {e.key: e for e in old}
+    after = {e.key: e for e in new}
+    added = [e for e in new if e.key not in before]
+    removed = [e for e in old if e.key not in after]
+    changed = [(before[e.key], e) for e in new if e.key in before and before[e.key] != e]
+    return added, removed, changed
+
+
+def _atomic_write(fp: str, payload: bytes, durable: bool = True) -> None:
+    """Replace fp with payload so that readers see either the old or the new file, never a torn one
+
+    With durable=False the data is not fsynced; the replace is still atomic.
+    """
+    import tempfile
+
+    directory = os.path.dirname(fp)
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(fp) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, fp)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if durable and hasattr(os, "O_DIRECTORY"):
+        # Persist the rename itself (POSIX only; Windows has no directory handles here)
+        dfd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dfd)
+        finally:
+            os.close(dfd)
+
+
+def _backup_data_file(payload: bytes, retention: int) -> None:
+    """Record payload as a new backup generation, keeping the newest `retention` generations"""
+    import hashlib
+
+    generations = _load_backup_index()
+    digest = hashlib.sha256(payload).hexdigest()
+    if generations and generations[-1]["hash"] == digest:
+        return  # unchanged since the last backup
+    _put_backup_blob(payload)
+    number = generations[-1]["generation"] + 1 if generations else 1
+    generations.append({"generation": number, "hash": digest, "time": time.time()})
+
+    retention = max(1, int(retention))
+    dropped, generations = generations[:-retention], generations[-retention:]
+    _write_backup_index(generations)
+    live = {g["hash"] for g in generations}
+    for g in dropped:
+        if g["hash"] not in live:
+            try:
+                os.remove(_backup_blob_path(g["hash"]))
+            except OSError:
+                pass
+
+
+def save_entries(entries: List[LauncherEntry], backup_generations: int = 10, seq: int = 0) -> None:
+    """Write a full snapshot (compacting the journal into it) and back it up
+
+    seq is the last journal operation the snapshot includes; the journal is emptied afterwards.
+    A crash in between is harmless because replay skips operations at or below the snapshot's seq.
+    """
+    body = json.dumps([e.to_dict() for e in entries], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    # Keep a backup generation of every distinct saved state (seq excluded so it deduplicates)
+    _backup_data_file(b'{"entries":' + body + b"}", backup_generations)
+    _atomic_write(_data_file(), b'{"seq":%d,"entries":' % seq + body + b"}")
+    _truncate_journal()
+
+
+def _lock_file() -> str:
+    return os.path.join(_app_data_dir(), "launcher.lock")
+
+
+class ExternalChangeError(RuntimeError):
+    """The catalog files were changed by someone else since this process last read or wrote them"""
+
+
+@contextlib.contextmanager
+def catalog_lock(shared: bool = False, timeout: float = 10.0):
+    """Advisory lock over the catalog files (launcher.lock), waited for up to timeout seconds
+
+    Writers hold it exclusively across a journal append or snapshot, readers shared across a
+    load (Windows has no shared mode, so readers are exclusive there). Only the launcher and
+    launcher_cli.py take it; hand edits are caught by JsonStorage.changed_externally instead.
+    """
+    f = open(_lock_file(), "a+b")
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if sys.platform.startswith("win"):
+                    import msvcrt
+
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                else:
+                    import fcntl
+
+                    fcntl.flock(f.fileno(), (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError("カタログが別のプロセスにロックされています")
+                time.sleep(0.02)
+        try:
+            yield
+        finally:
+            if sys.platform.startswith("win"):
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    finally:
+        f.close()
+
+
+def _file_state(path: str, known: Optional[tuple] = None, digest: bool = True) -> Optional[tuple]:
+    """(mtime_ns, size, sha256) of path, or None when it does not exist
+
+    The file is only read and hashed when its mtime or size differ from known's. With
+    digest=False the hash is left out (None), so any later stat change counts as a change.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    if known is not None and known[:2] == (st.st_mtime_ns, st.st_size):
+        return known
+    if not digest:
+        return st.st_mtime_ns, st.st_size, None
+    import hashlib
+
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).digest()
+    return st.st_mtime_ns, st.st_size, digest
+
+
+class CatalogStorage(ABC):
+    """Where the catalog lives; selected by the "storage" setting"""
+
+    @abstractmethod
+    def load(self, adopt: bool = False) -> LoadedCatalog:
+        """adopt: take a catalog recovered from a backup as current, so the next save replaces
+        the unreadable file (only once the user has been told)"""
+
+    @abstractmethod
+    def stream(self) -> CatalogStream:
+        """Incremental alternative to load() for a fast first paint"""
+
+    @abstractmethod
+    def append(self, ops: List[dict]) -> None:
+        """Persist operations recorded since the last call"""
+
+    @abstractmethod
+    def snapshot(self, entries: List[LauncherEntry], seq: int, ops: List[dict]) -> None:
+        """Persist the full catalog as of seq and take a backup generation
+
+        ops are the operations since the last write; entries already reflect them.
+        """
+
+    @abstractmethod
+    def restore(self, generation: int, entries: Optional[List[LauncherEntry]] = None) -> bool:
+        """Replace the catalog with a backup generation (or its contents read earlier, as entries)"""
+
+    def watched_paths(self) -> List[str]:
+        """Files whose changes by other programs changed_externally() can detect"""
+        return []
+
+    def changed_externally(self) -> bool:
+        return False
+
+
+class JsonStorage(CatalogStorage):
+    """launcher_data.json snapshot plus the operation journal
+
+    Writes take catalog_lock and refuse (ExternalChangeError) when the files no longer match
+    what this instance last read or wrote, so a concurrent edit is merged instead of overwritten.
+    """
+
+    def __init__(self, backup_generations: int = 10):
+        self.backup_generations = backup_generations
+        self._synced: Optional[tuple] = None  # _file_state of (data file, journal) as last seen
+
+    def _states(self, known: Optional[tuple] = None, digest: bool = True) -> tuple:
+        known = known or (None, None)
+        return (_file_state(_data_file(), known[0], digest),
+                _file_state(_journal_file(), known[1], digest))
+
+    def watched_paths(self) -> List[str]:
+        return [_data_file(), _journal_file()]
+
+    def _changed(self) -> bool:
+        if self._synced is None:
+            return False
+        current = self._states(self._synced)
+        if [s and s[2] for s in current] != [s and s[2] for s in self._synced]:
+            return True
+        self._synced = current  # only touched (new mtime, same bytes): not a change
+        return False
+
+    def changed_externally(self) -> bool:
+        """True when the files' contents differ from what was last read or written here"""
+        with catalog_lock(shared=True):
+            return self._changed()
+
+    def load(self, adopt: bool = False) -> LoadedCatalog:
+        with catalog_lock(shared=True):
+            states = self._states()
+            catalog = load_catalog()
+            # A data file that does not parse is not taken as seen, so it is never silently overwritten;
+            # writes are refused (as an external change) until it parses again
+            if not catalog.unreadable or (adopt and catalog.recovered):
+                self._synced = states
+            else:
+                self._synced = (None, None)
+            return catalog
+
+    def stream(self) -> CatalogStream:
+        # Taken before reading, so a change during the stream is seen as a change afterwards.
+        # Not hashed: that would read the whole file again before the first page is shown.
+        with catalog_lock(shared=True):
+            self._synced = self._states(digest=False)
+        return JsonCatalogStream(_data_file())
+
+    def _check_synced(self) -> None:
+        if self._changed():
+            raise ExternalChangeError("カタログが他のプログラムによって変更されています")
+
+    def append(self, ops: List[dict]) -> None:
+        with catalog_lock():
+            self._check_synced()
+            append_journal(ops)
+            self._synced = self._states(self._synced)
+
+    def snapshot(self, entries: List[LauncherEntry], seq: int, ops: List[dict]) -> None:
+        with catalog_lock():
+            self._check_synced()
+            save_entries(entries, backup_generations=self.backup_generations, seq=seq)
+            self._synced = self._states(self._synced)
+
+    def restore(self, generation: int, entries: Optional[List[LauncherEntry]] = None) -> bool:
+        with catalog_lock():
+            ok = restore_from_backup(generation, self.backup_generations, entries)
+            self._synced = self._states(self._synced)
+        return ok
+
+
+_ENTRY_COLUMNS = ("id", "name", "path", "description", "entry_type")
+
+
+class SqliteStorage(CatalogStorage):
+    """~/.launcher/launcher.db in WAL mode; every operation is a single-row transaction
+
+    Rows are ordered by a REAL position column, so a move or insert only rewrites the moved
+    row (its position becomes the midpoint of its new neighbours). Fields beyond the core
+    columns are kept as JSON in the extra column.
+    """
+
+    def __init__(self, path: Optional[str] = None, backup_generations: int = 10):
+        self.path = path or os.path.join(_app_data_dir(), "launcher.db")
+        self.backup_generations = backup_generations
+        is_new = not os.path.exists(self.path)
+        # Written from the save worker, read on the GUI thread; the lock serialises them
+        self._lock = threading.Lock()
+        import sqlite3
+
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " id TEXT PRIMARY KEY, position REAL NOT NULL, name TEXT NOT NULL, path TEXT NOT NULL,"
+                " description TEXT NOT NULL, entry_type TEXT NOT NULL, extra TEXT)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_position ON entries(position)")
+        if is_new:
+            # First use: take over the JSON catalog
+            self._replace_all(load_catalog().entries)
+
+    @staticmethod
+    def _row_values(d: dict) -> tuple:
+        extra = {k: v for k, v in d.items() if k not in _ENTRY_COLUMNS}
+        return (d["name"], d["path"], d["description"], d["entry_type"],
+                json.dumps(extra, ensure_ascii=False) if extra else None)
+
+    def _replace_all(self, entries: List[LauncherEntry]) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM entries")
+            self._db.executemany(
+                "INSERT INTO entries (id, position, name, path, description, entry_type, extra)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((e.id, float(i)) + self._row_values(e.to_dict()) for i, e in enumerate(entries)),
+            )
+
+    def load(self, adopt: bool = False) -> LoadedCatalog:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, name, path, description, entry_type, extra FROM entries ORDER BY position, id"
+            ).fetchall()
+        return LoadedCatalog([self._entry_from_row(r) for r in rows])
+
+    def stream(self) -> CatalogStream:
+        return _SqliteCatalogStream(self)
+
+    def _fetch_page(self, after: Optional[tuple], page_size: int) -> list:
+        query = "SELECT id, name, path, description, entry_type, extra, position FROM entries"
+        if after is None:
+            args: tuple = (page_size,)
+        else:
+            query += " WHERE (position, id) > (?, ?)"
+            args = after + (page_size,)
+        with self._lock:
+            return self._db.execute(query + " ORDER BY position, id LIMIT ?", args).fetchall()
+
+    @staticmethod
+    def _entry_from_row(row) -> LauncherEntry:
+        eid, name, path, description, entry_type, extra = row[:6]
+        d = json.loads(extra) if extra else {}
+        d.update(id=eid, name=name, path=path, description=description, entry_type=entry_type)
+        return entry_from_dict(d)
+
+    def _position_at(self, index: int, exclude: str = "") -> float:
+        """Position that sorts a row at index among the rows other than exclude"""
+        if index <= 0:
+            row = self._db.execute(
+                "SELECT position FROM entries WHERE id != ? ORDER BY position LIMIT 1", (exclude,)
+            ).fetchone()
+            return row[0] - 1.0 if row else 0.0
+        pair = self._db.execute(
+            "SELECT position FROM entries WHERE id != ? ORDER BY position LIMIT 2 OFFSET ?",
+            (exclude, index - 1),
+        ).fetchall()
+        if not pair:
+            row = self._db.execute("SELECT MAX(position) FROM entries WHERE id != ?", (exclude,)).fetchone()
+            return (row[0] if row[0] is not None else -1.0) + 1.0
+        if len(pair) == 1:
+            return pair[0][0] + 1.0
+        lo, hi = pair[0][0], pair[1][0]
+        mid = (lo + hi) / 2.0
+        if not lo < mid < hi:
+            # Out of float precision between these two: spread everything out again
+            self._renumber()
+            return self._position_at(index, exclude)
+        return mid
+
+    def _renumber(self) -> None:
+        ids = [r[0] for r in self._db.execute("SELECT id FROM entries ORDER BY position")]
+        self._db.executemany("UPDATE entries SET position = ? WHERE id = ?",
+                             ((float(i), eid) for i, eid in enumerate(ids)))
+
+    def append(self, ops: List[dict]) -> None:
+        with self._lock, self._db:
+            for op in ops:
+                kind = op["op"]
+                if kind == "add":
+                    d = op["entry"]
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO entries (id, position, name, path, description, entry_type, extra)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (d["id"], self._position_at(op["index"], d["id"])) + self._row_values(d),
+                    )
+                elif kind == "delete":
+                    self._db.execute("DELETE FROM entries WHERE id = ?", (op["entry"]["id"],))
+                elif kind == "update":
+                    d = op["after"]
+                    self._db.execute(
+                        "UPDATE entries SET name = ?, path = ?, description = ?, entry_type = ?, extra = ?"
+                        " WHERE id = ?",
+                        self._row_values(d) + (d["id"],),
+                    )
+                elif kind == "move":
+                    self._db.execute("UPDATE entries SET position = ? WHERE id = ?",
+                                     (self._position_at(op["to"], op["id"]), op["id"]))
+
+    def snapshot(self, entries: List[LauncherEntry], seq: int, ops: List[dict]) -> None:
+        # The database only lacks ops; apply those and take the backup generation
+        self.append(ops)
+        body = json.dumps([e.to_dict() for e in entries], ensure_ascii=False, separators=(",", ":"))
+        _backup_data_file(b'{"entries":' + body.encode("utf-8") + b"}", self.backup_generations)
+
+    def restore(self, generation: int, entries: Optional[List[LauncherEntry]] = None) -> bool:
+        try:
+            if entries is None:
+                entries = backup_entries(generation)
+        except Exception:
+            return False
+        self._replace_all(entries)
+        return True
+
+
+class _SqliteCatalogStream(CatalogStream):
+    """Keyset-paginated read, so each page is an index range scan"""
+
+    def __init__(self, storage: SqliteStorage):
+        super().__init__()
+        self._storage = storage
+
+    def pages(self, page_size: int) -> Iterator[List[LauncherEntry]]:
+        after = None
+        while True:
+            rows = self._storage._fetch_page(after, page_size)
+            if not rows:
+                return
+            after = (rows[-1][6], rows[-1][0])
+            yield [self._storage._entry_from_row(r) for r in rows]
+
+
+def open_storage(settings: dict) -> CatalogStorage:
+    if settings.get("storage") == "sqlite":
+        return SqliteStorage(backup_generations=settings["backup_generations"])
+    return JsonStorage(backup_generations=settings["backup_generations"])
+
+
+# -----------------------------
+# Search
+# -----------------------------
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _word_prefixes(name: str) -> set:
+    prefixes = set()
+    for word in re.split(r"[\s_\-./\\]+", name):
+        if word:
+            prefixes.add(word[:1])
+            prefixes.add(word[:2])
+    return prefixes
+
+
+def _subsequence_score(query: str, text: str) -> int:
+    """Score for query's characters appearing in order in text (runs score higher); 0 if they do not"""
+    score = 0
+    run = 0
+    pos = 0
+    for ch in query:
+        found = text.find(ch, pos)
+        if found < 0:
+            return 0
+        run = run + 1 if found == pos else 1
+        score += run
+        pos = found + 1
+    return score
+
+
+def _path_tail(path: str) -> str:
+    """Last two components of a path: the part worth matching (install roots repeat everywhere)"""
+    parts = re.split(r"[\\/]+", path.rstrip("\\/"))
+    return "/".join(parts[-2:])
+
+
+class SearchIndex:
+    """Trigram index over app entries' name, description and path, maintained per entry
+
+    Names and the other fields have separate trigram postings so name hits can be ranked
+    first. Queries of three or more characters intersect posting sets, falling back to
+    partial trigram overlap and then to in-order character matches for typos; shorter
+    queries use a word-prefix map on names. At most MAX_SCORED candidates are ranked with
+    fuzzy_score, which keeps each keystroke cheap on large catalogs; exact names and names
+    starting with the query go first, so a crowd of weaker matches cannot push them out.
+    """
+
+    FUZZY_MIN_OVERLAP = 0.6  # share of the query's trigrams a typo'd match must contain
+    MAX_SCORED = 300
+
+    def __init__(self):
+        self._docs: Dict[object, tuple] = {}  # key -> (entry, name, description, path), lowercased
+        self._name_grams: Dict[str, set] = {}
+        self._other_grams: Dict[str, set] = {}
+        self._prefixes: Dict[str, set] = {}
+        self._heads: Dict[str, set] = {}  # first three characters of the name (all of a shorter one) -> keys
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, entry: LauncherEntry) -> bool:
+        return entry.key in self._docs
+
+    def clear(self) -> None:
+        self._docs.clear()
+        self._name_grams.clear()
+        self._other_grams.clear()
+        self._prefixes.clear()
+        self._heads.clear()
+
+    @staticmethod
+    def _postings_for(doc: tuple):
+        name, description, path = doc[1], doc[2], doc[3]
+        return (_trigrams(name), _trigrams(description + "\n" + _path_tail(path)), _word_prefixes(name),
+                {name[:3]})
+
+    def add(self, entry: LauncherEntry) -> None:
+        if entry.entry_type == "separator":
+            return
+        key = entry.key
+        if key in self._docs:
+            self.remove(key)
+        doc = (entry, entry.name.lower(), entry.description.lower(), entry.path.lower())
+        self._docs[key] = doc
+        names, others, prefixes, heads = self._postings_for(doc)
+        for table, grams in ((self._name_grams, names), (self._other_grams, others), (self._prefixes, prefixes),
+                             (self._heads, heads)):
+            for gram in grams:
+                posting = table.get(gram)
+                if posting is None:
+                    table[gram] = {key}
+                else:
+                    posting.add(key)
+
+    def remove(self, key) -> None:
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return
+        names, others, prefixes, heads = self._postings_for(doc)
+        for table, grams in ((self._name_grams, names), (self._other_grams, others), (self._prefixes, prefixes),
+                             (self._heads, heads)):
+            for gram in grams:
+                posting = table.get(gram)
+                if posting is not None:
+                    posting.discard(key)
+                    if not posting:
+                        del table[gram]
+
+    def update(self, entry: LauncherEntry) -> None:
+        self.remove(entry.key)
+        self.add(entry)
+
+    @staticmethod
+    def _matches(table: Dict[str, set], grams: set):
+        """Keys present under every gram, generated lazily from the rarest posting"""
+        postings = [table.get(g) for g in grams]
+        if not all(postings):
+            return ()
+        postings.sort(key=len)
+        first, rest = postings[0], postings[1:]
+        if not rest:
+            return first
+        return (key for key in first if all(key in p for p in rest))
+
+    def _typo_candidates(self, q: str, grams: set) -> set:
+        postings = [p for p in (self._name_grams.get(g) for g in grams) if p]
+        need = max(1, int(len(grams) * self.FUZZY_MIN_OVERLAP + 0.999))
+        if len(postings) >= need:
+            counts: Dict[object, int] = {}
+            for posting in postings:
+                for key in posting:
+                    counts[key] = counts.get(key, 0) + 1
+            found = {key for key, n in counts.items() if n >= need}
+            if found:
+                return found
+        # Dropped letters break most trigrams; fall back to names starting like the query
+        return self._prefixes.get(q[:2], set())
+
+    def _head_matches(self, q: str) -> list:
+        """Keys whose name starts with q (just those named q for short queries), best scored first"""
+        if len(q) < 3:
+            return list(self._heads.get(q, ()))
+        docs = self._docs
+        starts = [key for key in self._heads.get(q[:3], ()) if docs[key][1].startswith(q)]
+        if len(starts) > self.MAX_SCORED:
+            starts.sort(key=lambda key: len(docs[key][1]))
+        return starts
+
+    def _candidates(self, q: str) -> Iterator:
+        """Candidate keys, name matches first; may repeat a key"""
+        yield from self._head_matches(q)
+        if len(q) < 3:
+            yield from self._prefixes.get(q, ())
+            return
+        grams = _trigrams(q)
+        found = False
+        for key in itertools.chain(self._matches(self._name_grams, grams), self._matches(self._other_grams, grams)):
+            found = True
+            yield key
+        if not found:
+            yield from self._typo_candidates(q, grams)
+
+    @staticmethod
+    def fuzzy_score(q: str, name: str, description: str, path: str) -> float:
+        pos = name.find(q)
+        if pos == 0:
+            return 1000.0 - len(name)
+        if pos > 0:
+            boundary = not name[pos - 1].isalnum()
+            return (800.0 if boundary else 600.0) - pos - len(name) * 0.1
+        if q in description:
+            return 400.0 - len(description) * 0.01
+        if q in path:
+            return 300.0 - len(path) * 0.01
+        sub = _subsequence_score(q, name)
+        if sub:
+            return 100.0 + sub
+        # Trigram overlap only (a typo)
+        return float(len(_trigrams(q) & _trigrams(name)))
+
+    def search(self, query: str, limit: int = 50, boost=None) -> List[LauncherEntry]:
+        """Best matches for query, best first; boost(entry) adds to the score if given"""
+        q = query.strip().lower()
+        if not q:
+            return []
+        docs = self._docs
+        scored = []
+        seen = set()
+        for key in self._candidates(q):
+            if key in seen:
+                continue
+            seen.add(key)
+            if len(seen) > self.MAX_SCORED:
+                break
+            entry, name, description, path = docs[key]
+            score = self.fuzzy_score(q, name, description, path)
+            if score <= 0:
+                continue
+            if boost is not None:
+                score += boost(entry)
+            scored.append((score, name, entry))
+        best = heapq.nlargest(limit, scored, key=lambda t: (t[0], -len(t[1])))
+        return [t[2] for t in best]
+
+
+def find_entry(entries: List[LauncherEntry], query: str,
+               index: Optional[SearchIndex] = None) -> Tuple[Optional[LauncherEntry], List[LauncherEntry]]:
+    """The app entry query names, or (None, candidates) when it is missing or ambiguous
+
+    Tried in order: exact id, case-insensitive name, then a search that has exactly one hit.
+    index is an up-to-date index over entries; one is built when it is not given.
+    """
+    apps = [e for e in entries if e.entry_type != "separator"]
+    key = id_key(query)
+    for e in apps:
+        if e.key == key:
+            return e, []
+    folded = query.casefold()
+    named = [e for e in apps if e.name.casefold() == folded]
+    if len(named) == 1:
+        return named[0], []
+    if named:
+        return None, named
+    if index is None:
+        index = SearchIndex()
+        for e in apps:
+            index.add(e)
+    hits = index.search(query, limit=10)
+    if len(hits) == 1:
+        return hits[0], []
+    return None, hits
+
+
+# -----------------------------
+# Launch history
+# -----------------------------
+
+
+def _history_file() -> str:
+    return os.path.join(_app_data_dir(), "launch_history.bin")
+
+
+def history_key(entry: LauncherEntry) -> bytes:
+    """16-byte key for the launch history: the uuid itself, or a digest of a non-uuid id"""
+    if isinstance(entry.key, bytes):
+        return entry.key
+    import hashlib
+
+    return hashlib.blake2b(entry.key.encode("utf-8"), digest_size=16).digest()
+
+
+class LaunchHistory:
+    """Append-only log of launches with a decaying frecency score per entry
+
+    Each launch is one fixed-size record (16-byte key, timestamp, success flag). Scores are
+    kept as (value, time of last launch) and decayed lazily, so recording a launch and
+    reading a score are both O(1); failed launches are logged but do not add to the score.
+    Records old enough to no longer matter are dropped when the file is compacted on load.
+    """
+
+    RECORD = struct.Struct("<16sdB")
+    COMPACT_BYTES = 1 << 20  # rewrite the log on load once it grows past this
+    FORGET_HALF_LIVES = 12  # a launch this old contributes < 1/4000 and is dropped on compaction
+
+    def __init__(self, path: Optional[str] = None, half_life_days: float = 14):
+        self.path = path or _history_file()
+        self._decay = math.log(2) / (max(half_life_days, 0.01) * 86400)
+        self._scores: Dict[bytes, Tuple[float, float]] = {}  # key -> (score at t, t)
+        self.launches = 0
+
+    def load(self) -> None:
+        try:
+            with open(self.path, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            print(f"起動履歴を読み込めません: {e}", file=sys.stderr)
+            return
+        # A torn final record from a crash is simply ignored
+        usable = len(raw) - len(raw) % self.RECORD.size
+        records = list(self.RECORD.iter_unpack(memoryview(raw)[:usable]))
+        for key, when, success in records:
+            self._apply(key, when, success)
+        self.launches = len(records)
+        if len(raw) > self.COMPACT_BYTES:
+            self._compact(records)
+
+    def _apply(self, key: bytes, when: float, success: int) -> None:
+        if not success:
+            return
+        score, at = self._scores.get(key, (0.0, when))
+        if when >= at:
+            score = score * math.exp(-self._decay * (when - at)) + 1.0
+        else:
+            # Out of order (clock change): decay the new launch to the stored time instead
+            score, when = score + math.exp(-self._decay * (at - when)), at
+        self._scores[key] = (score, when)
+
+    def _compact(self, records: list) -> None:
+        horizon = time.time() - self.FORGET_HALF_LIVES * math.log(2) / self._decay
+        kept = [r for r in records if r[1] >= horizon]
+        try:
+            _atomic_write(self.path, b"".join(self.RECORD.pack(*r) for r in kept), durable=False)
+            self.launches = len(kept)
+        except OSError as e:
+            print(f"起動履歴を整理できません: {e}", file=sys.stderr)
+
+    def record(self, entry: LauncherEntry, success: bool, when: Optional[float] = None) -> None:
+        key = history_key(entry)
+        when = time.time() if when is None else when
+        self._apply(key, when, int(success))
+        self.launches += 1
+        try:
+            with open(self.path, "ab") as f:
+                f.write(self.RECORD.pack(key, when, int(success)))
+        except OSError as e:
+            # Losing a history record only affects ranking
+            print(f"起動履歴を書き込めません: {e}", file=sys.stderr)
+
+    def score(self, entry: LauncherEntry, now: Optional[float] = None) -> float:
+        item = self._scores.get(history_key(entry))
+        if item is None:
+            return 0.0
+        score, at = item
+        now = time.time() if now is None else now
+        return score * math.exp(-self._decay * max(0.0, now - at))
+
+    def most_used(self, lookup, limit: int = 20) -> List[LauncherEntry]:
+        """Launched entries by descending frecency; lookup(key) maps a history key to a live entry"""
+        now = time.time()
+        ranked = sorted(self._scores.items(), reverse=True,
+                        key=lambda kv: kv[1][0] * math.exp(-self._decay * max(0.0, now - kv[1][1])))
+        result = []
+        for key, _ in ranked:
+            entry = lookup(key)
+            # Deleted entries keep their history until compaction; skip them
+            if entry is not None and entry.entry_type != "separator":
+                result.append(entry)
+                if len(result) == limit:
+                    break
+        return result
+
+
+# -----------------------------
+# Launching
+# -----------------------------
+
+
+@dataclass
+class LaunchSpec:
+    """Everything needed to start an entry: argv, working directory and environment"""
+
+    path: str  # the entry's file
+    argv: List[str] = field(default_factory=list)
+    cwd: Optional[str] = None
+    env: Optional[Dict[str, str]] = None  # complete environment, or None to inherit ours
+    cmdline: Optional[str] = None  # Windows: verbatim command line used instead of argv (cmd.exe quoting)
+    new_console: bool = False  # Windows: console programs get a window of their own
+    shell_open: bool = False  # hand the file to the OS (file association) instead of executing it
+    open_unless_executable: bool = False  # POSIX: shell_open instead if path is a folder or lacks the x bit
+    nice: int = 0  # POSIX nice increment / Windows priority class (see _priority_flags)
+
+
+def _console_wrap(spec: LaunchSpec) -> None:
+    """Run spec inside a console that stays open after the program exits"""
+    if sys.platform.startswith("win"):
+        # /s: strip exactly the outer quotes, so the inner command line reaches cmd untouched
+        spec.cmdline = f'cmd /s /k "{subprocess.list2cmdline(spec.argv)} & pause"'
+        spec.new_console = True
+        return
+    terminal = shutil.which("x-terminal-emulator")
+    if terminal:
+        # The arguments are passed through "$@", never spliced into the script
+        spec.argv = [terminal, "-e", "sh", "-c", '"$@"; echo; printf "%s" "Enter で閉じます"; read _',
+                     "sh", *spec.argv]
+
+
+def split_args(template: str, path: str) -> List[str]:
+    """Split an argument template like a command line, keeping backslashes (Windows paths)"""
+    lexer = shlex.shlex(template, posix=True)
+    lexer.whitespace_split = True
+    lexer.escape = ""
+    lexer.commenters = ""  # "#general" is an argument, not a comment
+    values = {"{path}": path, "{dir}": os.path.dirname(path),
+              "{name}": os.path.splitext(os.path.basename(path))[0]}
+    args = []
+    for token in lexer:
+        for placeholder, value in values.items():
+            token = token.replace(placeholder, value)
+        args.append(token)
+    return args
+
+
+def _interpreter_for(path: str, interpreter: str) -> str:
+    """Python executable for a script: the profile's (a venv directory or an executable) or the default"""
+    if not interpreter:
+        return _python_for(path)
+    base = os.path.basename(interpreter.rstrip("\\/")).lower()
+    if base.startswith("python") or base.endswith(".exe"):
+        return interpreter
+    # A venv directory; decided by name so resolving never touches the disk
+    gui = path.lower().endswith(".pyw")
+    if sys.platform.startswith("win"):
+        return os.path.join(interpreter, "Scripts", "pythonw.exe" if gui else "python.exe")
+    return os.path.join(interpreter, "bin", "python")
+
+
+def resolve_launch(entry: LauncherEntry) -> LaunchSpec:
+    """Direct argv for an entry; no intermediate shell unless the entry opts into a console"""
+    path = entry.path
+    profile = entry.profile or LaunchProfile()
+    ext = os.path.splitext(path)[1].lower()
+    cwd = os.path.dirname(path) or None
+    if profile.cwd:
+        cwd = os.path.join(cwd or "", profile.cwd)
+    spec = LaunchSpec(path=path, cwd=cwd, nice=profile.nice)
+    if profile.env:
+        env = dict(os.environ)
+        for key, value in profile.env.items():
+            if value:
+                env[key] = value
+            else:
+                env.pop(key, None)
+        spec.env = env
+    args = split_args(profile.args, path) if profile.args else []
+    windows = sys.platform.startswith("win")
+    if ext in (".py", ".pyw"):
+        spec.argv = [_interpreter_for(path, profile.interpreter), path, *args]
+        spec.new_console = ext == ".py"
+    elif ext in (".bat", ".cmd") and windows:
+        # Batch files need cmd.exe; /c exits with the script
+        spec.cmdline = f'cmd /s /c "{subprocess.list2cmdline([path, *args])}"'
+        spec.new_console = True
+    elif ext == ".exe" or not windows:
+        spec.argv = [path, *args]
+        spec.new_console = windows
+        # No extension tells programs from documents here; spawn_spec asks the file system
+        spec.open_unless_executable = not windows
+    else:
+        # その他のファイルはシステムデフォルトで開く
+        spec.shell_open = True
+        return spec
+    if entry.console:
+        _console_wrap(spec)
+    return spec
+
+
+def _priority_flags(nice: int) -> int:
+    """Windows creation flags for a nice level"""
+    if not nice or not sys.platform.startswith("win"):
+        return 0
+    if nice >= 10:
+        name = "IDLE_PRIORITY_CLASS"
+    elif nice > 0:
+        name = "BELOW_NORMAL_PRIORITY_CLASS"
+    elif nice <= -10:
+        name = "HIGH_PRIORITY_CLASS"
+    else:
+        name = "ABOVE_NORMAL_PRIORITY_CLASS"
+    return getattr(subprocess, name, 0)
+
+
+def _apply_nice(proc: subprocess.Popen, nice: int) -> None:
+    """POSIX: renice right after the spawn (a preexec_fn would rule out the vfork fast path)"""
+    if nice and hasattr(os, "setpriority"):
+        try:
+            os.setpriority(os.PRIO_PROCESS, proc.pid, max(-20, min(19, os.getpriority(os.PRIO_PROCESS, 0) + nice)))
+        except OSError:
+            pass  # raising priority needs privileges; run at the default instead
+
+
+def spawn_spec(spec: LaunchSpec, check: bool = True) -> Optional[subprocess.Popen]:
+    """Start spec; returns the process, or None when the OS shell opened the file
+
+    Runs on a launcher worker thread: the existence check and process creation can both
+    stall for seconds on network shares or while antivirus scans the file. Pass
+    check=False when the path is already known to exist. On POSIX, Popen execs argv
+    directly (vfork/posix_spawn under the hood), which os.posix_spawn itself cannot do
+    here since it has no way to set the working directory; folders and files without
+    the execute bit go to xdg-open/open instead.
+    """
+    if check and not os.path.exists(spec.path):
+        raise FileNotFoundError("ファイルが見つかりません。編集で修正してください。")
+    shell_open = spec.shell_open or (spec.open_unless_executable
+                                     and (os.path.isdir(spec.path) or not os.access(spec.path, os.X_OK)))
+    if shell_open:
+        if sys.platform.startswith("win"):
+            os.startfile(spec.path)  # type: ignore[attr-defined]
+            return None
+        opener = "open" if sys.platform == "darwin" else "xdg-open"
+        # The opener exits as soon as it has handed the file over, so it is not the launched program
+        subprocess.Popen([opener, spec.path], cwd=spec.cwd, env=spec.env)
+        return None
+    flags = subprocess.CREATE_NEW_CONSOLE if sys.platform.startswith("win") and spec.new_console else 0
+    proc = subprocess.Popen(spec.cmdline or spec.argv, cwd=spec.cwd, env=spec.env,
+                            creationflags=flags | _priority_flags(spec.nice))
+    _apply_nice(proc, spec.nice)
+    return proc
+
+
+# Runs inside a prewarmed interpreter: import the preload modules, then block on stdin until
+# the launcher hands over a script as one JSON line, and run it as __main__.
+_PREWARM_BOOTSTRAP = r"""
+import json, os, runpy, sys
+for _name in sys.argv[1:]:
+    try:
+        __import__(_name)
+    except Exception:
+        pass
+_line = sys.stdin.readline()
+if not _line:
+    sys.exit(0)
+_job = json.loads(_line)
+sys.stdin.close()
+sys.stdin = open(os.devnull)
+if os.name == "nt" and not _job["gui"]:
+    import ctypes
+    ctypes.windll.user32.ShowWindow(ctypes.windll.kernel32.GetConsoleWindow(), 5)
+if _job["cwd"]:
+    os.chdir(_job["cwd"])
+sys.argv = [_job["path"], *_job["args"]]
+sys.path[0] = os.path.dirname(os.path.abspath(_job["path"]))
+runpy.run_path(_job["path"], run_name="__main__")
+"""
+
+
+def _python_for(path: str) -> str:
+    gui = path.lower().endswith(".pyw") and sys.platform.startswith("win")
+    return (shutil.which("pythonw" if gui else "python") or shutil.which("python3")
+            or sys.executable)
+
+
+class PrewarmPool:
+    """Idle Python interpreters waiting to run a .py/.pyw entry
+
+    Each pool is keyed by (interpreter, console or not, preloaded modules). The plain pool
+    keeps size idle processes and each per-entry preload pool keeps one; a launch writes the
+    script path to an idle process and a replacement is started in the background.
+    Thread-safe: launch() is called from LaunchService workers. The script sees an empty
+    stdin, since the handoff pipe is the only one the launcher has.
+    """
+
+    def __init__(self, size: int = 2, preload: Optional[Dict[str, List[str]]] = None):
+        self.size = max(1, int(size))
+        self._preload = {k: tuple(v) for k, v in (preload or {}).items()}
+        self._idle: Dict[tuple, List[subprocess.Popen]] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="launcher-prewarm")
+
+    def preload_for(self, entry: LauncherEntry) -> tuple:
+        """Modules to preload for an entry; settings may name it by id or by path"""
+        return self._preload.get(entry.id) or self._preload.get(entry.path) or ()
+
+    @staticmethod
+    def _key(spec: LaunchSpec, preload: tuple) -> tuple:
+        return spec.argv[0], spec.path.lower().endswith(".pyw"), preload
+
+    @staticmethod
+    def _spawn(key: tuple) -> subprocess.Popen:
+        python, gui, preload = key
+        kwargs = {}
+        if sys.platform.startswith("win"):
+            if gui:
+                kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+            else:
+                # The console stays hidden until the bootstrap receives a script
+                info = subprocess.STARTUPINFO()
+                info.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+                info.wShowWindow = 0  # SW_HIDE
+                kwargs["creationflags"] = subprocess.CREATE_NEW_CONSOLE
+                kwargs["startupinfo"] = info
+        return subprocess.Popen([python, "-c", _PREWARM_BOOTSTRAP, *preload], stdin=subprocess.PIPE, **kwargs)
+
+    def fill(self, key: tuple) -> None:
+        """Top up the pool for this kind of script with idle interpreters"""
+        preload = key[2]
+        with self._lock:
+            if self._closed:
+                return
+            idle = self._idle.setdefault(key, [])
+            idle[:] = [p for p in idle if p.poll() is None]
+            missing = (1 if preload else self.size) - len(idle)
+        spawned = [self._spawn(key) for _ in range(missing)]
+        with self._lock:
+            if self._closed:
+                for proc in spawned:
+                    proc.stdin.close()
+                return
+            self._idle.setdefault(key, []).extend(spawned)
+
+    def fill_async(self, key: tuple) -> None:
+        self._executor.submit(self.fill, key)
+
+    def warm(self, entries: List[LauncherEntry], spec_for) -> None:
+        """Start pools for the kinds of Python entries in the catalog; spec_for(entry) -> LaunchSpec"""
+        keys = set()
+        for e in entries:
+            if not e.path.lower().endswith((".py", ".pyw")):
+                continue
+            try:
+                spec = spec_for(e)
+            except ValueError:
+                continue  # fails when launched, with the error shown there
+            if self.usable(e, spec):
+                keys.add(self._key(spec, self.preload_for(e)))
+        for key in keys:
+            self.fill_async(key)
+
+    @staticmethod
+    def usable(entry: LauncherEntry, spec: LaunchSpec) -> bool:
+        """Whether spec can run in a prewarmed interpreter: a plain script launch in our
+        environment (env overrides and priority must apply before the interpreter starts)"""
+        return (not entry.console and not spec.shell_open and spec.env is None and not spec.nice
+                and entry.path.lower().endswith((".py", ".pyw")))
+
+    def launch(self, spec: LaunchSpec, check: bool = True, preload: tuple = ()) -> subprocess.Popen:
+        """spawn_spec for .py/.pyw: hand the script to an idle interpreter (or a fresh one)"""
+        path = spec.path
+        if check and not os.path.exists(path):
+            raise FileNotFoundError("ファイルが見つかりません。編集で修正してください。")
+        key = self._key(spec, preload)
+        proc = None
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle and proc is None:
+                candidate = idle.pop(0)
+                if candidate.poll() is None:
+                    proc = candidate
+        if proc is None:
+            proc = self._spawn(key)
+        job = {"path": path, "args": spec.argv[2:], "cwd": spec.cwd, "gui": key[1]}
+        proc.stdin.write(json.dumps(job).encode("utf-8") + b"\n")
+        proc.stdin.close()
+        self.fill_async(key)
+        return proc
+
+    def shutdown(self) -> None:
+        """Idle interpreters exit when their stdin closes"""
+        with self._lock:
+            self._closed = True
+            idle = [p for procs in self._idle.values() for p in procs]
+            self._idle.clear()
+        self._executor.shutdown(wait=False)
+        for proc in idle:
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
@@ -0,0 +1,130 @@
+"""Command channel to the running launcher window
+
+The window listens on a QLocalServer: a Unix domain socket in the data directory on POSIX,
+a named pipe on Windows. A client sends one JSON request line and reads one JSON reply line:
+
+    {"cmd": "show"}
+    {"cmd": "run", "target": "<name|id>"}
+    {"cmd": "add", "path": "...", "name": "...", "description": "...", "category": "..."}
+    -> {"ok": true, "message": "...", ...}
+
+This module is imported before anything else when Launcher_main.py starts, so that a second
+start can hand over its command and exit without loading Qt; it only uses the stdlib.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+import time
+import zlib
+from typing import List, Optional
+
+WINDOWS = sys.platform.startswith("win")
+MAX_MESSAGE = 1 << 16  # longest request line the server accepts
+REPLY_TIMEOUT_S = 10.0  # the window answers from its event loop; allow for a busy moment
+
+
+def _data_dir() -> str:
+    # Same directory as launcher_core._app_data_dir(); one instance per data directory
+    return os.path.join(os.path.expanduser("~"), ".launcher")
+
+
+def server_name() -> str:
+    """What QLocalServer.listen() is given: a socket path on POSIX, a pipe name on Windows"""
+    if WINDOWS:
+        # Pipes live in one machine-wide namespace, so tell users and data directories apart
+        tag = zlib.crc32(os.path.normcase(os.path.abspath(_data_dir())).encode("utf-8"))
+        return f"launcher-{tag:08x}"
+    return os.path.join(_data_dir(), "launcher.sock")
+
+
+class _PipeStream:
+    def __init__(self, f):
+        self._f = f
+
+    def sendall(self, data: bytes) -> None:
+        self._f.write(data)
+
+    def recv(self, n: int) -> bytes:
+        return self._f.read(n)
+
+    def close(self) -> None:
+        self._f.close()
+
+
+def _connect(timeout: float):
+    """A stream to the running instance, or None when there is none"""
+    if WINDOWS:
+        path = r"\\.\pipe" + "\\" + server_name()
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return _PipeStream(open(path, "r+b", buffering=0))
+            except FileNotFoundError:
+                return None
+            except OSError as e:
+                # ERROR_PIPE_BUSY: the server is between connections; it will be back shortly
+                if getattr(e, "winerror", None) != 231 or time.monotonic() > deadline:
+                    raise
+                time.sleep(0.01)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(server_name())
+    except (FileNotFoundError, ConnectionRefusedError):
+        # No socket, or a stale one left by a crashed instance
+        sock.close()
+        return None
+    except BaseException:
+        sock.close()
+        raise
+    return sock
+
+
+def send_command(command: dict, timeout: float = REPLY_TIMEOUT_S) -> Optional[dict]:
+    """Send command to the running instance and return its reply; None if no instance is running"""
+    try:
+        stream = _connect(timeout)
+    except OSError:
+        return None
+    if stream is None:
+        return None
+    try:
+        stream.sendall(json.dumps(command, ensure_ascii=False).encode("utf-8") + b"\n")
+        buf = b""
+        while b"\n" not in buf:
+            chunk = stream.recv(4096)
+            if not chunk:
+                break
+            buf += chunk
+    except OSError as e:
+        return {"ok": False, "message": f"起動中のランチャーが応答しません: {e}"}
+    finally:
+        stream.close()
+    try:
+        reply = json.loads(buf.split(b"\n", 1)[0].decode("utf-8"))
+    except ValueError:
+        return {"ok": False, "message": "起動中のランチャーからの応答が不正です"}
+    return reply if isinstance(reply, dict) else {"ok": False, "message": "起動中のランチャーからの応答が不正です"}
+
+
+def command_from_argv(argv: List[str]) -> Optional[dict]:
+    """Launcher_main.py [run <name|id> | add <path>]; None if argv is not one of these"""
+    if not argv:
+        return {"cmd": "show"}
+    if len(argv) == 2 and argv[0] == "run":
+        return {"cmd": "run", "target": argv[1]}
+    if len(argv) == 2 and argv[0] == "add":
+        return {"cmd": "add", "path": os.path.abspath(argv[1])}
+    return None
+
+
+def report(reply: dict) -> int:
+    """Print a reply's message and return the matching exit code"""
+    message = reply.get("message")
+    if message:
+        print(message, file=sys.stdout if reply.get("ok") else sys.stderr)
+    return 0 if reply.get("ok") else 1
@@ -0,0 +1,181 @@
+"""Tests for the catalog journal, undo operations and backups in launcher_core
+
+Each test runs against its own temporary home directory, so ~/.launcher is never touched.
+Run with `python -m unittest discover tests` (or pytest) from the repository root.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import launcher_core as core
+
+
+def _app(i: int) -> core.LauncherEntry:
+    return core.LauncherEntry(f"id{i}", f"App {i}", f"/opt/app{i}")
+
+
+def _ids(entries):
+    return [e.id for e in entries]
+
+
+class TempHomeTestCase(unittest.TestCase):
+    def setUp(self):
+        self.home = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.home, ignore_errors=True)
+        patcher = mock.patch.dict(os.environ, {"HOME": self.home, "USERPROFILE": self.home})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+# -----------------------------
+# apply_op / invert_op
+# -----------------------------
+
+
+class OperationTests(unittest.TestCase):
+    def setUp(self):
+        self.entries = [_app(i) for i in range(5)]
+
+    def assert_round_trip(self, op):
+        before = [e.to_dict() for e in self.entries]
+        self.assertTrue(core.apply_op(self.entries, op))
+        self.assertTrue(core.apply_op(self.entries, core.invert_op(op)))
+        self.assertEqual([e.to_dict() for e in self.entries], before)
+
+    def test_move_to_is_the_index_after_removal(self):
+        # id1 taken out of [0, 1, 2, 3, 4] and inserted at 3 of [0, 2, 3, 4]
+        core.apply_op(self.entries, {"op": "move", "id": "id1", "from": 1, "to": 3})
+        self.assertEqual(_ids(self.entries), ["id0", "id2", "id3", "id1", "id4"])
+
+    def test_move_round_trips_both_directions(self):
+        self.assert_round_trip({"op": "move", "id": "id1", "from": 1, "to": 3})
+        self.assert_round_trip({"op": "move", "id": "id4", "from": 4, "to": 0})
+
+    def test_add_delete_update_round_trip(self):
+        self.assert_round_trip({"op": "add", "index": 2, "entry": _app(9).to_dict()})
+        self.assert_round_trip({"op": "delete", "index": 3, "entry": self.entries[3].to_dict()})
+        after = dict(self.entries[1].to_dict(), name="Renamed")
+        self.assert_round_trip({"op": "update", "index": 1, "before": self.entries[1].to_dict(), "after": after})
+
+    def test_stale_index_is_resolved_by_id(self):
+        op = {"op": "delete", "index": 0, "entry": self.entries[3].to_dict()}
+        self.assertTrue(core.apply_op(self.entries, op))
+        self.assertEqual(_ids(self.entries), ["id0", "id1", "id2", "id4"])
+
+    def test_missing_entry_does_not_apply(self):
+        self.assertFalse(core.apply_op(self.entries, {"op": "move", "id": "gone", "from": 0, "to": 1}))
+        self.assertFalse(core.apply_op(self.entries, {"op": "delete", "index": 0, "entry": _app(9).to_dict()}))
+        self.assertEqual(_ids(self.entries), [f"id{i}" for i in range(5)])
+
+    def test_diff_entries(self):
+        new = [self.entries[0], core.LauncherEntry("id1", "Renamed", "/opt/app1"), _app(7)]
+        added, removed, changed = core.diff_entries(self.entries[:3], new)
+        self.assertEqual(_ids(added), ["id7"])
+        self.assertEqual(_ids(removed), ["id2"])
+        self.assertEqual([(a.name, b.name) for a, b in changed], [("App 1", "Renamed")])
+
+
+# -----------------------------
+# Journal replay
+# -----------------------------
+
+
+class LoadCatalogTests(TempHomeTestCase):
+    def test_journal_replays_onto_snapshot(self):
+        core.save_entries([_app(0), _app(1)], seq=2)
+        core.append_journal([{"op": "add", "index": 2, "entry": _app(2).to_dict(), "seq": 3},
+                             {"op": "move", "id": "id2", "from": 2, "to": 0, "seq": 4}])
+        catalog = core.load_catalog()
+        self.assertEqual(_ids(catalog.entries), ["id2", "id0", "id1"])
+        self.assertEqual(catalog.seq, 4)
+        self.assertEqual(len(catalog.history), 2)
+        self.assertFalse(catalog.torn)
+
+    def test_operations_at_or_below_snapshot_seq_are_skipped(self):
+        # A crash between writing the snapshot and emptying the journal leaves these behind
+        core.save_entries([_app(0), _app(1)], seq=5)
+        core.append_journal([{"op": "add", "index": 0, "entry": _app(8).to_dict(), "seq": 4},
+                             {"op": "add", "index": 2, "entry": _app(9).to_dict(), "seq": 6}])
+        catalog = core.load_catalog()
+        self.assertEqual(_ids(catalog.entries), ["id0", "id1", "id9"])
+        self.assertEqual(catalog.seq, 6)
+
+    def test_torn_journal_record_stops_replay(self):
+        core.save_entries([_app(0)])
+        core.append_journal([{"op": "add", "index": 1, "entry": _app(1).to_dict(), "seq": 1}])
+        with open(core._journal_file(), "ab") as f:
+            f.write(b'{"op":"add","index":2,"entry":{"id":"id2"')
+        catalog = core.load_catalog()
+        self.assertTrue(catalog.torn)
+        self.assertEqual(_ids(catalog.entries), ["id0", "id1"])
+
+    def test_corrupt_primary_falls_back_to_newest_backup(self):
+        core.save_entries([_app(0)])
+        core.save_entries([_app(0), _app(1)])
+        with open(core._data_file(), "wb") as f:
+            f.write(b'{"entries":[{"id":"id0"')
+        catalog = core.load_catalog()
+        self.assertTrue(catalog.unreadable)
+        self.assertTrue(catalog.recovered)
+        self.assertEqual(_ids(catalog.entries), ["id0", "id1"])
+
+    def test_corrupt_primary_without_backup_is_not_recovered(self):
+        os.makedirs(os.path.dirname(core._data_file()), exist_ok=True)
+        with open(core._data_file(), "wb") as f:
+            f.write(b'{"entries":[{"id":"keep"')
+        catalog = core.load_catalog()
+        self.assertTrue(catalog.unreadable)
+        self.assertFalse(catalog.recovered)
+        self.assertEqual(catalog.entries, [])
+
+    def test_unreadable_file_is_not_overwritten_by_storage(self):
+        os.makedirs(os.path.dirname(core._data_file()), exist_ok=True)
+        with open(core._data_file(), "wb") as f:
+            f.write(b'{"entries":[{"id":"keep"')
+        storage = core.JsonStorage()
+        catalog = storage.load(adopt=True)
+        with self.assertRaises(core.ExternalChangeError):
+            storage.snapshot(catalog.entries, catalog.seq, [])
+        with open(core._data_file(), "rb") as f:
+            self.assertEqual(f.read(), b'{"entries":[{"id":"keep"')
+
+
+# -----------------------------
+# Backups
+# -----------------------------
+
+
+class BackupTests(TempHomeTestCase):
+    def test_unchanged_save_adds_no_generation(self):
+        core.save_entries([_app(0)], seq=1)
+        core.save_entries([_app(0)], seq=2)  # seq is not part of the backup
+        self.assertEqual(len(core.get_backup_generations()), 1)
+
+    def test_retention_keeps_newest_generations(self):
+        for n in range(1, 6):
+            core._backup_data_file(b'{"entries":[%d]}' % n, retention=3)
+        generations = core.get_backup_generations()
+        self.assertEqual([g["generation"] for g in generations], [5, 4, 3])
+        self.assertEqual(core.read_backup(3), b'{"entries":[3]}')
+        blobs = [n for n in os.listdir(core._backup_dir()) if n.endswith(".json.gz")]
+        self.assertEqual(len(blobs), 3)
+
+    def test_shared_blob_survives_pruning_of_an_older_generation(self):
+        for payload in (b"a", b"b", b"a"):
+            core._backup_data_file(payload, retention=2)
+        self.assertEqual([g["generation"] for g in core.get_backup_generations()], [3, 2])
+        self.assertEqual(core.read_backup(3), b"a")
+
+    def test_restore_oldest_generation(self):
+        core.save_entries([_app(0)], backup_generations=2)
+        core.save_entries([_app(0), _app(1)], backup_generations=2)
+        oldest = core.get_backup_generations()[-1]["generation"]
+        self.assertTrue(core.restore_from_backup(oldest, backup_generations=2))
+        self.assertEqual(_ids(core.load_entries()), ["id0"])
+
+
+if __name__ == "__main__":
+    unittest.main()